@@ -170,20 +170,18 @@ MAX_LABEL_LENGTH = 63
 
 # Domain validation pattern (RFC 1035 compliant, no trailing dot)
 DOMAIN_PATTERN = re.compile(
-    r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)*"
-    r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?$"
+    r"\A(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)*"
+    r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\Z",
+    re.ASCII,
 )
 
-# Time format pattern (HH:MM, 24-hour format)
-TIME_PATTERN = re.compile(r"^([01]?[0-9]|2[0-3]):([0-5][0-9])$")
-
 # URL pattern for DOMAINS_URL validation (port captured for additional validation)
 URL_PATTERN = re.compile(
-    r"^https?://"  # http:// or https://
+    r"\Ahttps?://"  # http:// or https://
     r"(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+"  # domain labels
     r"[a-zA-Z]{2,}"  # TLD (at least 2 chars)
     r"(?::(\d{1,5}))?"  # optional port (captured for validation)
-    r"(?:/[^\s]*)?$",  # optional path
+    r"(?:/[^\s]*)?\Z",  # optional path
     re.IGNORECASE,
 )
 
@@ -209,7 +207,7 @@ WEEKDAY_TO_DAY = ("monday", "tuesday", "wednesday", "thursday", "friday", "satur
 
 # Category ID pattern: lowercase letters, numbers, and hyphens
 # Must start with a letter, max 50 characters total
-CATEGORY_ID_PATTERN = re.compile(r"^[a-z][a-z0-9-]{0,49}$")
+CATEGORY_ID_PATTERN = re.compile(r"\A[a-z][a-z0-9-]{0,49}\Z", re.ASCII)
 
 # =============================================================================
 # NEXTDNS PARENTAL CONTROL CONSTANTS
@@ -417,6 +415,40 @@ def is_subdomain(child: str, parent: str) -> bool:
     return child_lower.endswith("." + parent_lower)
 
 
+def parse_time_minutes(time_str: str) -> Optional[int]:
+    """
+    Parse a time string in HH:MM format (24-hour) into minutes since midnight.
+
+    The hour may be one or two digits ("9:30" or "09:30"); the minute must
+    be exactly two. Uses plain string slicing rather than a regex or
+    strptime since this runs for every time range in every schedule.
+
+    Args:
+        time_str: Time string to parse
+
+    Returns:
+        Minutes since midnight, or None if the format is invalid
+    """
+    if not time_str or not isinstance(time_str, str):
+        return None
+
+    hour_part, sep, minute_part = time_str.partition(":")
+    if not sep or not 1 <= len(hour_part) <= 2 or len(minute_part) != 2:
+        return None
+
+    # isdigit() alone accepts Unicode digits, so require ASCII as well
+    digits = hour_part + minute_part
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+
+    hours = int(hour_part)
+    minutes = int(minute_part)
+    if hours > 23 or minutes > 59:
+        return None
+
+    return hours * 60 + minutes
+
+
 def validate_time_format(time_str: str) -> bool:
     """
     Validate a time string in HH:MM format.
@@ -427,9 +459,7 @@ def validate_time_format(time_str: str) -> bool:
     Returns:
         True if valid HH:MM format, False otherwise
     """
-    if not time_str or not isinstance(time_str, str):
-        return False
-    return TIME_PATTERN.match(time_str) is not None
+    return parse_time_minutes(time_str) is not None
 
 
 def validate_url(url: str) -> bool:
@@ -618,20 +648,26 @@ def write_secure_file(path: Path, content: str) -> None:
         # Create parent directories if needed for other paths
         resolved_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Set secure permissions before writing if file exists
-    if resolved_path.exists():
+    # Set secure permissions before opening an existing file, so a read-only
+    # file can be opened for writing and nothing is written under loose modes
+    with contextlib.suppress(FileNotFoundError):
         os.chmod(resolved_path, SECURE_FILE_MODE)
 
-    # Write with exclusive lock
-    fd = os.open(resolved_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, SECURE_FILE_MODE)
+    # Write with exclusive lock. O_TRUNC is left out so the old content is only
+    # discarded once permissions are tight and the lock is held.
+    fd = os.open(resolved_path, os.O_WRONLY | os.O_CREAT, SECURE_FILE_MODE)
     fd_closed = False
     try:
         # os.fdopen takes ownership of fd - it will close it when the file object closes
         f = os.fdopen(fd, "w")
         fd_closed = True  # fd is now owned by f
         try:
+            # Covers a file created by another process between chmod and open
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), SECURE_FILE_MODE)
             _lock_file(f, exclusive=True)
             try:
+                f.truncate(0)
                 f.write(content)
                 f.flush()  # Ensure data is written before unlocking
                 os.fsync(f.fileno())  # Force write to disk
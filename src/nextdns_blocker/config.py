@@ -1,9 +1,13 @@
 """Configuration loading and validation for NextDNS Blocker."""
 
+import difflib
 import json
 import logging
 import os
 import re
+import string
+from collections.abc import Set as AbstractSet
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Optional
 
@@ -18,10 +22,10 @@ from .common import (
     NEXTDNS_SERVICES,
     VALID_DAYS,
     parse_env_value,
+    parse_time_minutes,
     safe_int,
     validate_category_id,
     validate_domain,
-    validate_time_format,
 )
 from .exceptions import ConfigurationError
 
@@ -29,37 +33,51 @@ from .exceptions import ConfigurationError
 # CREDENTIAL VALIDATION PATTERNS
 # =============================================================================
 
-# NextDNS API key pattern: alphanumeric with optional underscores/hyphens
-# Minimum 8 characters for flexibility with test keys
-API_KEY_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{8,}$")
+# All validation patterns are compiled once at import. Patterns that only
+# accept ASCII use re.ASCII so \d and friends skip Unicode class lookups
+# (and do not accept non-ASCII digits).
 
-# NextDNS Profile ID pattern: alphanumeric, typically 6 characters like "abc123"
-PROFILE_ID_PATTERN = re.compile(r"^[a-zA-Z0-9_-]{4,30}$")
+# Characters allowed in API keys and profile IDs: ASCII alphanumerics,
+# underscores and hyphens. A frozenset membership test is cheaper than
+# running a regex for a simple character-class + length check.
+CREDENTIAL_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+
+# NextDNS API key: minimum 8 characters for flexibility with test keys
+API_KEY_MIN_LENGTH = 8
+
+# NextDNS Profile ID: typically 6 characters like "abc123"
+PROFILE_ID_MIN_LENGTH = 4
+PROFILE_ID_MAX_LENGTH = 30
 
 # Discord Webhook pattern: Stricter validation
 # - Webhook ID: 17-20 digit snowflake (Discord uses snowflakes as IDs)
 # - Token: 60-100 character alphanumeric with underscores/hyphens/dots
 #   (extended range to accommodate Discord's varying token lengths)
 DISCORD_WEBHOOK_PATTERN = re.compile(
-    r"^https://discord\.com/api/webhooks/\d{17,20}/[a-zA-Z0-9_.-]{60,100}$"
+    r"\Ahttps://discord\.com/api/webhooks/\d{17,20}/[a-zA-Z0-9_.-]{60,100}\Z", re.ASCII
 )
 
 # Telegram Bot Token pattern: 123456:ABC-DEF...
-TELEGRAM_BOT_TOKEN_PATTERN = re.compile(r"^\d+:[a-zA-Z0-9_-]{35,}$")
+TELEGRAM_BOT_TOKEN_PATTERN = re.compile(r"\A\d+:[a-zA-Z0-9_-]{35,}\Z", re.ASCII)
 
 # Slack Webhook pattern
 SLACK_WEBHOOK_PATTERN = re.compile(
-    r"^https://hooks\.slack\.com/services/[A-Z0-9]+/[A-Z0-9]+/[a-zA-Z0-9]+$"
+    r"\Ahttps://hooks\.slack\.com/services/[A-Z0-9]+/[A-Z0-9]+/[a-zA-Z0-9]+\Z", re.ASCII
 )
 
+# Schedule template name: starts with a lowercase letter, then lowercase
+# letters, numbers or hyphens, 50 characters max
+SCHEDULE_NAME_PATTERN = re.compile(r"\A[a-z][a-z0-9-]{0,49}\Z", re.ASCII)
+
+# Valid environment variable name in .env files (POSIX-compliant)
+ENV_KEY_PATTERN = re.compile(r"\A[a-zA-Z_][a-zA-Z0-9_]*\Z", re.ASCII)
+
 # =============================================================================
 # UNBLOCK DELAY SETTINGS
 # =============================================================================
 
-# Flexible duration pattern: number followed by unit (m=minutes, h=hours, d=days)
-DURATION_PATTERN = re.compile(r"^(\d+)([mhd])$")
-
-# Duration unit multipliers (to seconds)
+# Duration unit multipliers (to seconds), keyed by the unit suffix
+# (m=minutes, h=hours, d=days). Durations are parsed as "<digits><unit>".
 DURATION_MULTIPLIERS = {"m": 60, "h": 3600, "d": 86400}
 
 
@@ -93,20 +111,15 @@ def parse_duration(value: str) -> Optional[int]:
     if value == "0":
         return 0
 
-    match = DURATION_PATTERN.match(value)
-    if not match:
+    multiplier = DURATION_MULTIPLIERS.get(value[-1:])
+    amount_str = value[:-1]
+    if multiplier is None or not (amount_str.isascii() and amount_str.isdecimal()):
         raise ValueError(
             f"Invalid duration format: '{value}'. "
             f"Expected: 'never', '0', or number with unit (e.g., '30m', '2h', '1d')"
         )
 
-    amount = int(match.group(1))
-    unit = match.group(2)
-
-    if amount == 0:
-        return 0
-
-    return amount * DURATION_MULTIPLIERS[unit]
+    return int(amount_str) * multiplier
 
 
 def validate_api_key(api_key: str) -> bool:
@@ -121,7 +134,8 @@ def validate_api_key(api_key: str) -> bool:
     """
     if not api_key or not isinstance(api_key, str):
         return False
-    return API_KEY_PATTERN.match(api_key.strip()) is not None
+    api_key = api_key.strip()
+    return len(api_key) >= API_KEY_MIN_LENGTH and CREDENTIAL_CHARS.issuperset(api_key)
 
 
 def validate_profile_id(profile_id: str) -> bool:
@@ -136,7 +150,10 @@ def validate_profile_id(profile_id: str) -> bool:
     """
     if not profile_id or not isinstance(profile_id, str):
         return False
-    return PROFILE_ID_PATTERN.match(profile_id.strip()) is not None
+    profile_id = profile_id.strip()
+    if not PROFILE_ID_MIN_LENGTH <= len(profile_id) <= PROFILE_ID_MAX_LENGTH:
+        return False
+    return CREDENTIAL_CHARS.issuperset(profile_id)
 
 
 def validate_discord_webhook(url: str) -> bool:
@@ -240,6 +257,49 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 
 
+def _resolve_config_override(override_path: Path) -> Path:
+    """
+    Resolve and validate a config directory override.
+
+    Args:
+        override_path: Path supplied by the user
+
+    Returns:
+        Resolved absolute path
+
+    Raises:
+        ConfigurationError: If the path is invalid or outside allowed directories
+    """
+    # Resolve to absolute path and validate
+    try:
+        resolved = override_path.resolve()
+    except (OSError, RuntimeError) as e:
+        raise ConfigurationError(f"Invalid config path: {e}") from e
+
+    # Security: Ensure the path is within user's home directory or standard config locations
+    import tempfile
+
+    allowed_roots: list[Path] = [
+        Path("/tmp").resolve(),  # Allow temp directories for testing  # nosec B108
+        Path(tempfile.gettempdir()).resolve(),  # System temp dir (e.g., /var/folders on macOS)
+    ]
+
+    # Add home directory if available (may fail in some CI environments)
+    try:
+        home = Path.home().resolve()
+        allowed_roots.insert(0, home)
+    except (OSError, RuntimeError):
+        pass  # Home directory not available, continue with temp dirs only
+
+    # Check if resolved path is within allowed directories
+    is_allowed = any(resolved == root or root in resolved.parents for root in allowed_roots)
+
+    if not is_allowed:
+        raise ConfigurationError(f"Config path must be within home directory or /tmp: {resolved}")
+
+    return resolved
+
+
 def get_config_dir(override: Optional[Path] = None) -> Path:
     """
     Get the configuration directory path.
@@ -260,37 +320,7 @@ def get_config_dir(override: Optional[Path] = None) -> Path:
         ConfigurationError: If override path is invalid or outside allowed directories
     """
     if override:
-        override_path = Path(override)
-        # Resolve to absolute path and validate
-        try:
-            resolved = override_path.resolve()
-        except (OSError, RuntimeError) as e:
-            raise ConfigurationError(f"Invalid config path: {e}") from e
-
-        # Security: Ensure the path is within user's home directory or standard config locations
-        import tempfile
-
-        allowed_roots: list[Path] = [
-            Path("/tmp").resolve(),  # Allow temp directories for testing  # nosec B108
-            Path(tempfile.gettempdir()).resolve(),  # System temp dir (e.g., /var/folders on macOS)
-        ]
-
-        # Add home directory if available (may fail in some CI environments)
-        try:
-            home = Path.home().resolve()
-            allowed_roots.insert(0, home)
-        except (OSError, RuntimeError):
-            pass  # Home directory not available, continue with temp dirs only
-
-        # Check if resolved path is within allowed directories
-        is_allowed = any(resolved == root or root in resolved.parents for root in allowed_roots)
-
-        if not is_allowed:
-            raise ConfigurationError(
-                f"Config path must be within home directory or /tmp: {resolved}"
-            )
-
-        return resolved
+        return _resolve_config_override(Path(override))
 
     # Use CWD if .env exists there (config lives in database)
     cwd = Path.cwd()
@@ -354,32 +384,24 @@ def _validate_hours_blocks(
                 errors.append(f"{prefix}: time_range #{tr_idx} must be a dictionary")
                 continue
 
-            start_valid = True
-            end_valid = True
-            for key in ["start", "end"]:
+            # Parse each bound once; minutes are reused for overlap detection
+            bounds: dict[str, Optional[int]] = {}
+            for key in ("start", "end"):
                 if key not in time_range:
                     errors.append(f"{prefix}: missing '{key}' in time_range")
-                    if key == "start":
-                        start_valid = False
-                    else:
-                        end_valid = False
-                elif not validate_time_format(time_range[key]):
+                    bounds[key] = None
+                    continue
+                bounds[key] = parse_time_minutes(time_range[key])
+                if bounds[key] is None:
                     errors.append(
                         f"{prefix}: invalid time format '{time_range[key]}' "
                         f"for '{key}' (expected HH:MM)"
                     )
-                    if key == "start":
-                        start_valid = False
-                    else:
-                        end_valid = False
 
             # Collect time ranges for overlap detection
-            if start_valid and end_valid:
-                start_h, start_m = map(int, time_range["start"].split(":"))
-                end_h, end_m = map(int, time_range["end"].split(":"))
-                start_mins = start_h * 60 + start_m
-                end_mins = end_h * 60 + end_m
-
+            start_mins = bounds["start"]
+            end_mins = bounds["end"]
+            if start_mins is not None and end_mins is not None:
                 for day in block_days:
                     if day not in day_time_ranges:
                         day_time_ranges[day] = []
@@ -434,13 +456,10 @@ def validate_schedule(schedule: dict[str, Any], prefix: str) -> list[str]:
         if len(ranges) < 2:
             continue
 
-        # Sort by start time
-        sorted_ranges = sorted(ranges, key=lambda x: x[0])
-
-        for i in range(len(sorted_ranges) - 1):
-            start1, end1, block1 = sorted_ranges[i]
-            start2, end2, block2 = sorted_ranges[i + 1]
+        # Sort by start time (lists are built for this check, so sort in place)
+        ranges.sort(key=itemgetter(0))
 
+        for (start1, end1, block1), (start2, end2, block2) in zip(ranges, ranges[1:]):
             # Handle overnight ranges (end < start means it crosses midnight)
             is_overnight1 = end1 < start1
             is_overnight2 = end2 < start2
@@ -473,12 +492,7 @@ def validate_schedule_name(name: str) -> bool:
     """
     if not name or not isinstance(name, str):
         return False
-    if len(name) > 50:
-        return False
-    # Must start with lowercase letter, contain only lowercase, numbers, hyphens
-    import re
-
-    return bool(re.match(r"^[a-z][a-z0-9-]*$", name))
+    return SCHEDULE_NAME_PATTERN.match(name) is not None
 
 
 def validate_schedules_section(schedules: dict[str, Any]) -> list[str]:
@@ -512,7 +526,7 @@ def validate_schedules_section(schedules: dict[str, Any]) -> list[str]:
 
 
 def validate_schedule_or_reference(
-    schedule: Any, prefix: str, valid_schedule_names: set[str]
+    schedule: Any, prefix: str, valid_schedule_names: AbstractSet[str]
 ) -> list[str]:
     """
     Validate a schedule that can be either inline or a reference to a template.
@@ -529,13 +543,11 @@ def validate_schedule_or_reference(
         return []
 
     if isinstance(schedule, str):
-        # It's a reference to a schedule template
-        if schedule not in valid_schedule_names:
-            available = (
-                ", ".join(sorted(valid_schedule_names)) if valid_schedule_names else "(none)"
-            )
-            return [f"{prefix}: unknown schedule '{schedule}'. Available schedules: {available}"]
-        return []
+        # It's a reference to a schedule template; a known name is the common case
+        if schedule in valid_schedule_names:
+            return []
+        available = ", ".join(sorted(valid_schedule_names)) if valid_schedule_names else "(none)"
+        return [f"{prefix}: unknown schedule '{schedule}'. Available schedules: {available}"]
 
     if isinstance(schedule, dict):
         # It's an inline schedule
@@ -573,13 +585,70 @@ def resolve_schedule_reference(
     return None
 
 
+def _resolve_entry_schedules(
+    entries: list[dict[str, Any]], schedules: dict[str, dict[str, Any]]
+) -> None:
+    """
+    Replace schedule references in config entries with their definitions, in place.
+
+    Args:
+        entries: Config entries (blocklist, allowlist, categories, ...)
+        schedules: Dictionary of schedule templates
+    """
+    for entry in entries:
+        schedule = entry.get("schedule")
+        if schedule is not None:
+            entry["schedule"] = resolve_schedule_reference(schedule, schedules)
+
+
 # =============================================================================
 # DOMAIN CONFIG VALIDATION
 # =============================================================================
 
 
+def _unblock_delay_errors(config: dict[str, Any], prefix: str) -> list[str]:
+    """Validate the optional 'unblock_delay' field of a config entry."""
+    unblock_delay = config.get("unblock_delay")
+    if unblock_delay is None or validate_unblock_delay(unblock_delay):
+        return []
+    return [
+        f"{prefix}: invalid unblock_delay '{unblock_delay}' "
+        f"(expected: 'never', '0', or duration like '30m', '2h', '1d')"
+    ]
+
+
+def _description_errors(config: dict[str, Any], prefix: str) -> list[str]:
+    """Validate the optional 'description' field of a config entry."""
+    description = config.get("description")
+    if description is None or isinstance(description, str):
+        return []
+    return [f"{prefix}: 'description' must be a string"]
+
+
+def _schedule_errors(
+    config: dict[str, Any], prefix: str, valid_schedule_names: Optional[AbstractSet[str]]
+) -> list[str]:
+    """
+    Validate the optional 'schedule' field of a config entry.
+
+    Args:
+        config: Entry configuration dictionary
+        prefix: Prefix for error messages
+        valid_schedule_names: Set of valid schedule template names (if None, only inline validated)
+
+    Returns:
+        List of error messages (empty if valid or absent)
+    """
+    schedule = config.get("schedule")
+    if schedule is None:
+        return []
+    if valid_schedule_names is not None:
+        return validate_schedule_or_reference(schedule, prefix, valid_schedule_names)
+    return validate_schedule(schedule, prefix)
+
+
 def validate_domain_config(
-    config: dict[str, Any], index: int, valid_schedule_names: Optional[set[str]] = None
+    config: dict[str, Any], index: int, valid_schedule_names: Optional[AbstractSet[str]] = None
 ) -> list[str]:
     """
     Validate a single domain configuration entry.
@@ -606,30 +675,15 @@ def validate_domain_config(
     if not validate_domain(domain):
         return [f"#{index}: Invalid domain format '{domain}'"]
 
-    # Validate unblock_delay if present
-    unblock_delay = config.get("unblock_delay")
-    if unblock_delay is not None and not validate_unblock_delay(unblock_delay):
-        errors.append(
-            f"'{domain}': invalid unblock_delay '{unblock_delay}' "
-            f"(expected: 'never', '0', or duration like '30m', '2h', '1d')"
-        )
-
-    # Check schedule if present
-    schedule = config.get("schedule")
-    if schedule is not None:
-        if valid_schedule_names is not None:
-            schedule_errors = validate_schedule_or_reference(
-                schedule, f"'{domain}'", valid_schedule_names
-            )
-        else:
-            schedule_errors = validate_schedule(schedule, f"'{domain}'")
-        errors.extend(schedule_errors)
+    prefix = f"'{domain}'"
+    errors.extend(_unblock_delay_errors(config, prefix))
+    errors.extend(_schedule_errors(config, prefix, valid_schedule_names))
 
     return errors
 
 
 def validate_allowlist_config(
-    config: dict[str, Any], index: int, valid_schedule_names: Optional[set[str]] = None
+    config: dict[str, Any], index: int, valid_schedule_names: Optional[AbstractSet[str]] = None
 ) -> list[str]:
     """
     Validate a single allowlist configuration entry.
@@ -657,15 +711,7 @@ def validate_allowlist_config(
         return [f"allowlist #{index}: Invalid domain format '{domain}'"]
 
     # Validate schedule if present (allowlist now supports scheduled entries)
-    schedule = config.get("schedule")
-    if schedule is not None:
-        if valid_schedule_names is not None:
-            schedule_errors = validate_schedule_or_reference(
-                schedule, f"allowlist '{domain}'", valid_schedule_names
-            )
-        else:
-            schedule_errors = validate_schedule(schedule, f"allowlist '{domain}'")
-        errors.extend(schedule_errors)
+    errors.extend(_schedule_errors(config, f"allowlist '{domain}'", valid_schedule_names))
 
     # Validate suppress_subdomain_warning if present (optional, must be boolean)
     suppress_warning = config.get("suppress_subdomain_warning")
@@ -678,7 +724,7 @@ def validate_allowlist_config(
 
 
 def validate_category_config(
-    config: dict[str, Any], index: int, valid_schedule_names: Optional[set[str]] = None
+    config: dict[str, Any], index: int, valid_schedule_names: Optional[AbstractSet[str]] = None
 ) -> list[str]:
     """
     Validate a single category configuration entry.
@@ -729,29 +775,68 @@ def validate_category_config(
                 elif not validate_domain(domain.strip()):
                     errors.append(f"{prefix}: invalid domain format '{domain}'")
 
-    # Validate description if present (optional)
-    description = config.get("description")
-    if description is not None and not isinstance(description, str):
-        errors.append(f"{prefix}: 'description' must be a string")
+    # Validate optional fields (schedule can be null)
+    errors.extend(_description_errors(config, prefix))
+    errors.extend(_unblock_delay_errors(config, prefix))
+    errors.extend(_schedule_errors(config, prefix, valid_schedule_names))
 
-    # Validate unblock_delay if present (optional)
-    unblock_delay = config.get("unblock_delay")
-    if unblock_delay is not None and not validate_unblock_delay(unblock_delay):
-        errors.append(
-            f"{prefix}: invalid unblock_delay '{unblock_delay}' "
-            f"(expected: 'never', '0', or duration like '30m', '2h', '1d')"
-        )
+    return errors
 
-    # Validate schedule if present (optional, can be null)
-    schedule = config.get("schedule")
-    if schedule is not None:
-        if valid_schedule_names is not None:
-            schedule_errors = validate_schedule_or_reference(schedule, prefix, valid_schedule_names)
-        else:
-            schedule_errors = validate_schedule(schedule, prefix)
-        errors.extend(schedule_errors)
 
-    return errors
+def _normalize_domain_entries(entries: list[dict[str, Any]]) -> list[tuple[int, str, str]]:
+    """
+    Normalize the domains of a list of entries for comparison.
+
+    Computed once per config load and shared by the duplicate and overlap
+    checks, so each domain is stripped and lowercased a single time.
+
+    Args:
+        entries: List of domain configurations
+
+    Returns:
+        List of (index, original domain, normalized domain) for entries
+        with a non-empty string domain
+    """
+    normalized: list[tuple[int, str, str]] = []
+    for index, entry in enumerate(entries):
+        domain = entry.get("domain")
+        if isinstance(domain, str) and domain:
+            normalized.append((index, domain, domain.strip().lower()))
+    return normalized
+
+
+def _normalize_category_domains(categories: list[dict[str, Any]]) -> list[tuple[str, str]]:
+    """
+    Normalize the domains of every category for comparison.
+
+    Args:
+        categories: List of category configurations
+
+    Returns:
+        List of (category id, normalized domain) pairs
+    """
+    normalized: list[tuple[str, str]] = []
+    for category in categories:
+        category_id = category.get("id", "unknown")
+        category_domains = category.get("domains", [])
+
+        # Ensure category_domains is a list (could be None if explicitly set)
+        if not isinstance(category_domains, list):
+            category_domains = []
+
+        for domain in category_domains:
+            if isinstance(domain, str) and domain.strip():
+                normalized.append((category_id, domain.strip().lower()))
+    return normalized
+
+
+def _overlap_errors(denylist_domains: set[str], allowlist_domains: set[str]) -> list[str]:
+    """Build errors for normalized domains present in both denylist and allowlist."""
+    return [
+        f"Domain '{domain}' appears in both 'domains' (denylist) and 'allowlist'. "
+        f"A domain cannot be blocked and allowed simultaneously."
+        for domain in sorted(denylist_domains & allowlist_domains)
+    ]
 
 
 def validate_no_overlap(
@@ -767,28 +852,10 @@ def validate_no_overlap(
     Returns:
         List of error messages (empty if no conflicts)
     """
-    errors: list[str] = []
-
-    denylist_domains = {
-        d["domain"].strip().lower()
-        for d in domains
-        if "domain" in d and isinstance(d["domain"], str)
-    }
-    allowlist_domains = {
-        a["domain"].strip().lower()
-        for a in allowlist
-        if "domain" in a and isinstance(a["domain"], str)
-    }
-
-    overlap = denylist_domains & allowlist_domains
-
-    for domain in sorted(overlap):
-        errors.append(
-            f"Domain '{domain}' appears in both 'domains' (denylist) and 'allowlist'. "
-            f"A domain cannot be blocked and allowed simultaneously."
-        )
-
-    return errors
+    return _overlap_errors(
+        {key for _, _, key in _normalize_domain_entries(domains)},
+        {key for _, _, key in _normalize_domain_entries(allowlist)},
+    )
 
 
 def check_subdomain_relationships(
@@ -940,6 +1007,33 @@ def check_category_ineffective_blocks(
                     )
 
 
+def _cross_location_errors(
+    category_domains: list[tuple[str, str]], blocklist_domains: list[tuple[int, str, str]]
+) -> list[str]:
+    """Build errors for normalized domains found in more than one category/blocklist."""
+    errors: list[str] = []
+
+    # Track all domains and their sources
+    domain_sources: dict[str, list[str]] = {}  # domain -> list of sources
+
+    for category_id, domain_lower in category_domains:
+        domain_sources.setdefault(domain_lower, []).append(f"category '{category_id}'")
+
+    for _, _, domain_lower in blocklist_domains:
+        domain_sources.setdefault(domain_lower, []).append("blocklist")
+
+    # Find duplicates (only the duplicated domains need sorting for stable output)
+    duplicates = [(d, sources) for d, sources in domain_sources.items() if len(sources) > 1]
+    for domain, sources in sorted(duplicates):
+        sources_str = " and ".join(sources)
+        errors.append(
+            f"Domain '{domain}' appears in multiple locations: {sources_str}. "
+            f"A domain can only exist in one category or blocklist."
+        )
+
+    return errors
+
+
 def validate_no_duplicate_domains(
     categories: list[dict[str, Any]], blocklist: list[dict[str, Any]]
 ) -> list[str]:
@@ -953,40 +1047,29 @@ def validate_no_duplicate_domains(
     Returns:
         List of error messages (empty if no duplicates)
     """
-    errors: list[str] = []
+    return _cross_location_errors(
+        _normalize_category_domains(categories), _normalize_domain_entries(blocklist)
+    )
 
-    # Track all domains and their sources
-    domain_sources: dict[str, list[str]] = {}  # domain -> list of sources
 
-    # Collect domains from categories
-    for category in categories:
-        category_id = category.get("id", "unknown")
-        category_domains = category.get("domains", [])
+def _duplicate_errors(normalized: list[tuple[int, str, str]], list_name: str) -> list[str]:
+    """Build errors for normalized domains repeated within the same list."""
+    errors: list[str] = []
 
-        for domain in category_domains:
-            if isinstance(domain, str) and domain.strip():
-                domain_lower = domain.strip().lower()
-                if domain_lower not in domain_sources:
-                    domain_sources[domain_lower] = []
-                domain_sources[domain_lower].append(f"category '{category_id}'")
-
-    # Collect domains from blocklist
-    for block_entry in blocklist:
-        domain = block_entry.get("domain", "")
-        if isinstance(domain, str) and domain.strip():
-            domain_lower = domain.strip().lower()
-            if domain_lower not in domain_sources:
-                domain_sources[domain_lower] = []
-            domain_sources[domain_lower].append("blocklist")
-
-    # Find duplicates
-    for domain, sources in sorted(domain_sources.items()):
-        if len(sources) > 1:
-            sources_str = " and ".join(sources)
+    # Fast path: most configs have no duplicates, so a single set build
+    # decides the common case without the per-entry bookkeeping below
+    if len({domain_lower for _, _, domain_lower in normalized}) == len(normalized):
+        return errors
+
+    seen: dict[str, int] = {}
+    for index, domain, domain_lower in normalized:
+        if domain_lower in seen:
             errors.append(
-                f"Domain '{domain}' appears in multiple locations: {sources_str}. "
-                f"A domain can only exist in one category or blocklist."
+                f"Duplicate domain '{domain}' in {list_name} at index {index}. "
+                f"First occurrence at index {seen[domain_lower]}."
             )
+        else:
+            seen[domain_lower] = index
 
     return errors
 
@@ -1002,24 +1085,7 @@ def validate_no_duplicates(entries: list[dict[str, Any]], list_name: str) -> lis
     Returns:
         List of error messages (empty if no duplicates)
     """
-    errors: list[str] = []
-    seen: dict[str, int] = {}
-
-    for index, entry in enumerate(entries):
-        domain = entry.get("domain", "")
-        if not domain or not isinstance(domain, str):
-            continue
-
-        domain_lower = domain.strip().lower()
-        if domain_lower in seen:
-            errors.append(
-                f"Duplicate domain '{domain}' in {list_name} at index {index}. "
-                f"First occurrence at index {seen[domain_lower]}."
-            )
-        else:
-            seen[domain_lower] = index
-
-    return errors
+    return _duplicate_errors(_normalize_domain_entries(entries), list_name)
 
 
 def validate_unique_category_ids(categories: list[dict[str, Any]]) -> list[str]:
@@ -1033,19 +1099,26 @@ def validate_unique_category_ids(categories: list[dict[str, Any]]) -> list[str]:
         List of error messages (empty if all IDs are unique)
     """
     errors: list[str] = []
-    seen_ids: dict[str, int] = {}  # id -> first occurrence index
+    indexed: list[tuple[int, str, str]] = []
 
     for idx, category in enumerate(categories):
         category_id = category.get("id")
         if isinstance(category_id, str) and category_id.strip():
-            id_lower = category_id.strip().lower()
-            if id_lower in seen_ids:
-                errors.append(
-                    f"category #{idx}: Duplicate id '{category_id}' "
-                    f"(first defined at category #{seen_ids[id_lower]})"
-                )
-            else:
-                seen_ids[id_lower] = idx
+            indexed.append((idx, category_id, category_id.strip().lower()))
+
+    # Fast path: no duplicate IDs
+    if len({id_lower for _, _, id_lower in indexed}) == len(indexed):
+        return errors
+
+    seen_ids: dict[str, int] = {}  # id -> first occurrence index
+    for idx, category_id, id_lower in indexed:
+        if id_lower in seen_ids:
+            errors.append(
+                f"category #{idx}: Duplicate id '{category_id}' "
+                f"(first defined at category #{seen_ids[id_lower]})"
+            )
+        else:
+            seen_ids[id_lower] = idx
 
     return errors
 
@@ -1054,9 +1127,29 @@ def validate_unique_category_ids(categories: list[dict[str, Any]]) -> list[str]:
 # NEXTDNS PARENTAL CONTROL VALIDATION
 # =============================================================================
 
+# Global parental_control settings accepted by NextDNS
+PARENTAL_CONTROL_KEYS = frozenset({"safe_search", "youtube_restricted_mode", "block_bypass"})
+
+
+def _suggest_id(value: str, valid_ids: frozenset[str]) -> str:
+    """
+    Build a "did you mean" hint for an unknown NextDNS ID.
+
+    Only called on the error path; membership itself is a frozenset lookup.
+
+    Args:
+        value: The unknown ID
+        valid_ids: Known IDs to match against
+
+    Returns:
+        Hint sentence with a leading space, or an empty string if nothing is close
+    """
+    matches = difflib.get_close_matches(value, valid_ids, n=1)
+    return f" Did you mean '{matches[0]}'?" if matches else ""
+
 
 def validate_nextdns_category(
-    config: dict[str, Any], index: int, valid_schedule_names: Optional[set[str]] = None
+    config: dict[str, Any], index: int, valid_schedule_names: Optional[AbstractSet[str]] = None
 ) -> list[str]:
     """
     Validate a single NextDNS native category configuration entry.
@@ -1085,39 +1178,22 @@ def validate_nextdns_category(
     if category_id not in NEXTDNS_CATEGORIES:
         valid_ids = ", ".join(sorted(NEXTDNS_CATEGORIES))
         return [
-            f"nextdns.categories[{index}]: Invalid category id '{category_id}'. "
-            f"Valid IDs: {valid_ids}"
+            f"nextdns.categories[{index}]: Invalid category id '{category_id}'."
+            f"{_suggest_id(category_id, NEXTDNS_CATEGORIES)} Valid IDs: {valid_ids}"
         ]
 
     prefix = f"nextdns.categories['{category_id}']"
 
-    # Validate description if present (optional)
-    description = config.get("description")
-    if description is not None and not isinstance(description, str):
-        errors.append(f"{prefix}: 'description' must be a string")
-
-    # Validate unblock_delay if present (optional)
-    unblock_delay = config.get("unblock_delay")
-    if unblock_delay is not None and not validate_unblock_delay(unblock_delay):
-        errors.append(
-            f"{prefix}: invalid unblock_delay '{unblock_delay}' "
-            f"(expected: 'never', '0', or duration like '30m', '2h', '1d')"
-        )
-
-    # Validate schedule if present (optional, can be null)
-    schedule = config.get("schedule")
-    if schedule is not None:
-        if valid_schedule_names is not None:
-            schedule_errors = validate_schedule_or_reference(schedule, prefix, valid_schedule_names)
-        else:
-            schedule_errors = validate_schedule(schedule, prefix)
-        errors.extend(schedule_errors)
+    # Validate optional fields (schedule can be null)
+    errors.extend(_description_errors(config, prefix))
+    errors.extend(_unblock_delay_errors(config, prefix))
+    errors.extend(_schedule_errors(config, prefix, valid_schedule_names))
 
     return errors
 
 
 def validate_nextdns_service(
-    config: dict[str, Any], index: int, valid_schedule_names: Optional[set[str]] = None
+    config: dict[str, Any], index: int, valid_schedule_names: Optional[AbstractSet[str]] = None
 ) -> list[str]:
     """
     Validate a single NextDNS native service configuration entry.
@@ -1144,36 +1220,19 @@ def validate_nextdns_service(
 
     # Validate against known NextDNS services
     if service_id not in NEXTDNS_SERVICES:
-        # Group services by category for better error message
         errors.append(
-            f"nextdns.services[{index}]: Invalid service id '{service_id}'. "
-            f"See documentation for valid service IDs (43 available)."
+            f"nextdns.services[{index}]: Invalid service id '{service_id}'."
+            f"{_suggest_id(service_id, NEXTDNS_SERVICES)} "
+            f"See documentation for valid service IDs ({len(NEXTDNS_SERVICES)} available)."
         )
         return errors
 
     prefix = f"nextdns.services['{service_id}']"
 
-    # Validate description if present (optional)
-    description = config.get("description")
-    if description is not None and not isinstance(description, str):
-        errors.append(f"{prefix}: 'description' must be a string")
-
-    # Validate unblock_delay if present (optional)
-    unblock_delay = config.get("unblock_delay")
-    if unblock_delay is not None and not validate_unblock_delay(unblock_delay):
-        errors.append(
-            f"{prefix}: invalid unblock_delay '{unblock_delay}' "
-            f"(expected: 'never', '0', or duration like '30m', '2h', '1d')"
-        )
-
-    # Validate schedule if present (optional, can be null)
-    schedule = config.get("schedule")
-    if schedule is not None:
-        if valid_schedule_names is not None:
-            schedule_errors = validate_schedule_or_reference(schedule, prefix, valid_schedule_names)
-        else:
-            schedule_errors = validate_schedule(schedule, prefix)
-        errors.extend(schedule_errors)
+    # Validate optional fields (schedule can be null)
+    errors.extend(_description_errors(config, prefix))
+    errors.extend(_unblock_delay_errors(config, prefix))
+    errors.extend(_schedule_errors(config, prefix, valid_schedule_names))
 
     return errors
 
@@ -1193,13 +1252,11 @@ def validate_nextdns_parental_control(config: dict[str, Any]) -> list[str]:
     if not isinstance(config, dict):
         return ["nextdns.parental_control: must be an object"]
 
-    valid_keys = {"safe_search", "youtube_restricted_mode", "block_bypass"}
-
     for key, value in config.items():
-        if key not in valid_keys:
+        if key not in PARENTAL_CONTROL_KEYS:
             errors.append(
                 f"nextdns.parental_control: unknown key '{key}'. "
-                f"Valid keys: {', '.join(sorted(valid_keys))}"
+                f"Valid keys: {', '.join(sorted(PARENTAL_CONTROL_KEYS))}"
             )
         elif not isinstance(value, bool):
             errors.append(f"nextdns.parental_control.{key}: must be a boolean")
@@ -1208,7 +1265,7 @@ def validate_nextdns_parental_control(config: dict[str, Any]) -> list[str]:
 
 
 def validate_nextdns_config(
-    nextdns_config: dict[str, Any], valid_schedule_names: Optional[set[str]] = None
+    nextdns_config: dict[str, Any], valid_schedule_names: Optional[AbstractSet[str]] = None
 ) -> list[str]:
     """
     Validate the complete nextdns configuration section.
@@ -1299,7 +1356,7 @@ def load_nextdns_config(script_dir: str) -> Optional[dict[str, Any]]:
         return None
 
     schedules = db.get_all_schedules()
-    valid_schedule_names: Optional[set[str]] = set(schedules.keys()) if schedules else None
+    valid_schedule_names: Optional[AbstractSet[str]] = frozenset(schedules) if schedules else None
     if schedules:
         schedule_errors = validate_schedules_section(schedules)
         if schedule_errors:
@@ -1343,15 +1400,8 @@ def load_nextdns_config(script_dir: str) -> Optional[dict[str, Any]]:
             logger.error(error)
         raise ConfigurationError(f"NextDNS configuration validation failed: {len(errors)} error(s)")
 
-    for category in nextdns_config["categories"]:
-        schedule = category.get("schedule")
-        if schedule is not None:
-            category["schedule"] = resolve_schedule_reference(schedule, schedules)
-
-    for service in nextdns_config["services"]:
-        schedule = service.get("schedule")
-        if schedule is not None:
-            service["schedule"] = resolve_schedule_reference(schedule, schedules)
+    _resolve_entry_schedules(nextdns_config["categories"], schedules)
+    _resolve_entry_schedules(nextdns_config["services"], schedules)
 
     return nextdns_config
 
@@ -1484,7 +1534,8 @@ def load_domains(script_dir: str) -> tuple[list[dict[str, Any]], list[dict[str,
             logger.error(error)
         raise ConfigurationError(f"Schedule validation failed: {len(schedule_errors)} error(s)")
 
-    valid_schedule_names: set[str] = set(schedules.keys())
+    # Built once and shared by every entry validator below
+    valid_schedule_names = frozenset(schedules)
 
     blocklist = [_blocklist_entry_from_db(r) for r in db.get_all_blocked_domains()]
     categories = [_category_from_db(r) for r in db.get_all_categories()]
@@ -1501,13 +1552,19 @@ def load_domains(script_dir: str) -> tuple[list[dict[str, Any]], list[dict[str,
         all_errors.extend(validate_domain_config(domain_config, idx, valid_schedule_names))
     for idx, allowlist_config in enumerate(allowlist):
         all_errors.extend(validate_allowlist_config(allowlist_config, idx, valid_schedule_names))
-    all_errors.extend(validate_no_duplicates(blocklist, "blocklist"))
-    all_errors.extend(validate_no_duplicates(allowlist, "allowlist"))
-    all_errors.extend(validate_no_duplicate_domains(categories, blocklist))
 
-    category_domains_as_blocklist = _expand_categories(categories)
-    combined_blocklist = blocklist + category_domains_as_blocklist
-    all_errors.extend(validate_no_overlap(combined_blocklist, allowlist))
+    # Normalize domain case once and share it across the cross-entry checks
+    blocklist_domains = _normalize_domain_entries(blocklist)
+    allowlist_domains = _normalize_domain_entries(allowlist)
+    category_domains = _normalize_category_domains(categories)
+
+    all_errors.extend(_duplicate_errors(blocklist_domains, "blocklist"))
+    all_errors.extend(_duplicate_errors(allowlist_domains, "allowlist"))
+    all_errors.extend(_cross_location_errors(category_domains, blocklist_domains))
+
+    denylist_keys = {key for _, _, key in blocklist_domains}
+    denylist_keys.update(key for _, key in category_domains)
+    all_errors.extend(_overlap_errors(denylist_keys, {key for _, _, key in allowlist_domains}))
 
     if all_errors:
         for error in all_errors:
@@ -1519,20 +1576,9 @@ def load_domains(script_dir: str) -> tuple[list[dict[str, Any]], list[dict[str,
     check_ineffective_blocks(blocklist, allowlist)
     check_category_ineffective_blocks(categories, allowlist)
 
-    for entry in blocklist:
-        schedule = entry.get("schedule")
-        if schedule is not None:
-            entry["schedule"] = resolve_schedule_reference(schedule, schedules)
-
-    for category in categories:
-        schedule = category.get("schedule")
-        if schedule is not None:
-            category["schedule"] = resolve_schedule_reference(schedule, schedules)
-
-    for entry in allowlist:
-        schedule = entry.get("schedule")
-        if schedule is not None:
-            entry["schedule"] = resolve_schedule_reference(schedule, schedules)
+    _resolve_entry_schedules(blocklist, schedules)
+    _resolve_entry_schedules(categories, schedules)
+    _resolve_entry_schedules(allowlist, schedules)
 
     expanded_domains = _expand_categories(categories)
     final_domains = blocklist + expanded_domains
@@ -1569,8 +1615,6 @@ def _load_env_file(env_file: Path) -> None:
     Args:
         env_file: Path to the .env file
     """
-    # Pattern for valid environment variable names (POSIX-compliant)
-    env_key_pattern = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
     max_value_length = 32768  # Reasonable limit for env var values
 
     with open(env_file, encoding="utf-8-sig") as f:  # utf-8-sig handles BOM
@@ -1594,7 +1638,7 @@ def _load_env_file(env_file: Path) -> None:
                 continue
 
             # Validate key format (POSIX-compliant env var name)
-            if not env_key_pattern.match(key):
+            if not ENV_KEY_PATTERN.match(key):
                 logger.warning(f".env line {line_num}: invalid key format '{key[:20]}', skipping")
                 continue
 
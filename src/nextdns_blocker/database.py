@@ -14,7 +14,7 @@ import logging
 import os
 import sqlite3
 import threading
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional, Union
@@ -440,6 +440,32 @@ def delete_config(key: str) -> bool:
 # BLOCKED DOMAINS OPERATIONS
 # =============================================================================
 
+_UPSERT_BLOCKED_DOMAIN_SQL = """
+INSERT INTO blocked_domains (domain, description, locked, unblock_delay, schedule)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(domain) DO UPDATE SET
+    description = COALESCE(excluded.description, description),
+    locked = excluded.locked,
+    unblock_delay = excluded.unblock_delay,
+    schedule = excluded.schedule,
+    updated_at = datetime('now')
+"""
+
+_UPSERT_ALLOWED_DOMAIN_SQL = """
+INSERT INTO allowed_domains (domain, description, schedule, suppress_subdomain_warning)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(domain) DO UPDATE SET
+    description = COALESCE(excluded.description, description),
+    schedule = excluded.schedule,
+    suppress_subdomain_warning = excluded.suppress_subdomain_warning,
+    updated_at = datetime('now')
+"""
+
+
+def _schedule_to_db(schedule: Optional[Union[str, dict[str, Any]]]) -> Optional[str]:
+    """Serialize an inline schedule dict to JSON; references pass through unchanged."""
+    return json.dumps(schedule) if isinstance(schedule, dict) else schedule
+
 
 def add_blocked_domain(
     domain: str,
@@ -451,18 +477,9 @@ def add_blocked_domain(
 ) -> int:
     """Add a domain to the blocklist. Returns the row ID."""
     conn = _conn or get_connection()
-    schedule_json = json.dumps(schedule) if isinstance(schedule, dict) else schedule
+    schedule_json = _schedule_to_db(schedule)
     cursor = conn.execute(
-        """
-        INSERT INTO blocked_domains (domain, description, locked, unblock_delay, schedule)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(domain) DO UPDATE SET
-            description = COALESCE(excluded.description, description),
-            locked = excluded.locked,
-            unblock_delay = excluded.unblock_delay,
-            schedule = excluded.schedule,
-            updated_at = datetime('now')
-        """,
+        _UPSERT_BLOCKED_DOMAIN_SQL,
         (domain, description, int(locked), unblock_delay, schedule_json),
     )
     if _conn is None:
@@ -470,6 +487,34 @@ def add_blocked_domain(
     return cursor.lastrowid or 0
 
 
+def add_blocked_domains(
+    entries: Iterable[dict[str, Any]], _conn: Optional[sqlite3.Connection] = None
+) -> int:
+    """
+    Add many blocklist entries with a single executemany call.
+
+    Entries use the config.json blocklist shape; entries without a domain
+    are skipped. Returns the number of rows written.
+    """
+    rows = [
+        (
+            e["domain"],
+            e.get("description"),
+            int(e.get("locked", False)),
+            e.get("unblock_delay", "4h"),
+            _schedule_to_db(e.get("schedule")),
+        )
+        for e in entries
+        if e.get("domain")
+    ]
+    if _conn is not None:
+        _conn.executemany(_UPSERT_BLOCKED_DOMAIN_SQL, rows)
+    else:
+        with transaction() as conn:
+            conn.executemany(_UPSERT_BLOCKED_DOMAIN_SQL, rows)
+    return len(rows)
+
+
 def remove_blocked_domain(domain: str) -> bool:
     """Remove a domain from the blocklist. Returns True if removed."""
     conn = get_connection()
@@ -514,17 +559,9 @@ def add_allowed_domain(
 ) -> int:
     """Add a domain to the allowlist. Returns the row ID."""
     conn = _conn or get_connection()
-    schedule_json = json.dumps(schedule) if isinstance(schedule, dict) else schedule
+    schedule_json = _schedule_to_db(schedule)
     cursor = conn.execute(
-        """
-        INSERT INTO allowed_domains (domain, description, schedule, suppress_subdomain_warning)
-        VALUES (?, ?, ?, ?)
-        ON CONFLICT(domain) DO UPDATE SET
-            description = COALESCE(excluded.description, description),
-            schedule = excluded.schedule,
-            suppress_subdomain_warning = excluded.suppress_subdomain_warning,
-            updated_at = datetime('now')
-        """,
+        _UPSERT_ALLOWED_DOMAIN_SQL,
         (domain, description, schedule_json, int(suppress_subdomain_warning)),
     )
     if _conn is None:
@@ -532,6 +569,33 @@ def add_allowed_domain(
     return cursor.lastrowid or 0
 
 
+def add_allowed_domains(
+    entries: Iterable[dict[str, Any]], _conn: Optional[sqlite3.Connection] = None
+) -> int:
+    """
+    Add many allowlist entries with a single executemany call.
+
+    Entries use the config.json allowlist shape; entries without a domain
+    are skipped. Returns the number of rows written.
+    """
+    rows = [
+        (
+            e["domain"],
+            e.get("description"),
+            _schedule_to_db(e.get("schedule")),
+            int(e.get("suppress_subdomain_warning", False)),
+        )
+        for e in entries
+        if e.get("domain")
+    ]
+    if _conn is not None:
+        _conn.executemany(_UPSERT_ALLOWED_DOMAIN_SQL, rows)
+    else:
+        with transaction() as conn:
+            conn.executemany(_UPSERT_ALLOWED_DOMAIN_SQL, rows)
+    return len(rows)
+
+
 def remove_allowed_domain(domain: str) -> bool:
     """Remove a domain from the allowlist. Returns True if removed."""
     conn = get_connection()
@@ -577,7 +641,7 @@ def add_category(
     _conn: Optional[sqlite3.Connection] = None,
 ) -> None:
     """Add or update a user-defined category."""
-    schedule_json = json.dumps(schedule) if isinstance(schedule, dict) else schedule
+    schedule_json = _schedule_to_db(schedule)
 
     def _do(conn: sqlite3.Connection) -> None:
         conn.execute(
@@ -597,11 +661,10 @@ def add_category(
         if domains is not None:
             # Replace all domains for this category
             conn.execute("DELETE FROM category_domains WHERE category_id = ?", (category_id,))
-            for domain in domains:
-                conn.execute(
-                    "INSERT INTO category_domains (category_id, domain) VALUES (?, ?)",
-                    (category_id, domain),
-                )
+            conn.executemany(
+                "INSERT INTO category_domains (category_id, domain) VALUES (?, ?)",
+                [(category_id, domain) for domain in domains],
+            )
 
     if _conn is not None:
         _do(_conn)
@@ -924,6 +987,14 @@ def get_retryable_entries(before: Optional[str] = None) -> list[dict[str, Any]]:
     return [dict(row) for row in cursor]
 
 
+def count_retry_entries() -> int:
+    """Count entries in the retry queue."""
+    conn = get_connection()
+    cursor = conn.execute("SELECT COUNT(*) FROM retry_queue")
+    result = cursor.fetchone()
+    return int(result[0]) if result else 0
+
+
 def remove_retry_entry(entry_id: str) -> bool:
     """Remove an entry from the retry queue."""
     conn = get_connection()
@@ -1094,7 +1165,7 @@ def set_nextdns_category(
 ) -> None:
     """Set a NextDNS native category configuration."""
     conn = _conn or get_connection()
-    schedule_json = json.dumps(schedule) if isinstance(schedule, dict) else schedule
+    schedule_json = _schedule_to_db(schedule)
     conn.execute(
         """
         INSERT INTO nextdns_categories (id, description, unblock_delay, schedule, locked)
@@ -1137,7 +1208,7 @@ def set_nextdns_service(
 ) -> None:
     """Set a NextDNS native service configuration."""
     conn = _conn or get_connection()
-    schedule_json = json.dumps(schedule) if isinstance(schedule, dict) else schedule
+    schedule_json = _schedule_to_db(schedule)
     conn.execute(
         """
         INSERT INTO nextdns_services (id, description, unblock_delay, schedule, locked)
@@ -1581,30 +1652,8 @@ def save_full_config_dict(config: dict[str, Any]) -> None:
                 cat.get("domains") or [],
                 _conn=conn,
             )
-        for b in config.get("blocklist") or []:
-            domain = b.get("domain")
-            if not domain:
-                continue
-            sched = b.get("schedule")
-            add_blocked_domain(
-                domain,
-                b.get("description"),
-                b.get("locked", False),
-                b.get("unblock_delay", "4h"),
-                sched,
-                _conn=conn,
-            )
-        for a in config.get("allowlist") or []:
-            domain = a.get("domain")
-            if not domain:
-                continue
-            add_allowed_domain(
-                domain,
-                a.get("description"),
-                a.get("schedule"),
-                a.get("suppress_subdomain_warning", False),
-                _conn=conn,
-            )
+        add_blocked_domains(config.get("blocklist") or [], _conn=conn)
+        add_allowed_domains(config.get("allowlist") or [], _conn=conn)
         set_config("migrated", True, _conn=conn)
 
 
@@ -1699,30 +1748,7 @@ def import_config_from_json(path: Path) -> None:
                 _conn=conn,
             )
 
-        for b in data.get("blocklist") or []:
-            domain = b.get("domain")
-            if not domain:
-                continue
-            sched = b.get("schedule")
-            add_blocked_domain(
-                domain,
-                b.get("description"),
-                b.get("locked", False),
-                b.get("unblock_delay", "4h"),
-                sched,
-                _conn=conn,
-            )
-
-        for a in data.get("allowlist") or []:
-            domain = a.get("domain")
-            if not domain:
-                continue
-            add_allowed_domain(
-                domain,
-                a.get("description"),
-                a.get("schedule"),
-                a.get("suppress_subdomain_warning", False),
-                _conn=conn,
-            )
+        add_blocked_domains(data.get("blocklist") or [], _conn=conn)
+        add_allowed_domains(data.get("allowlist") or [], _conn=conn)
 
         set_config("migrated", True, _conn=conn)
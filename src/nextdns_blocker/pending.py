@@ -122,6 +122,17 @@ def get_pending_actions(status: Optional[str] = None) -> list[dict[str, Any]]:
     return [dict(row) for row in cursor]
 
 
+def count_pending_actions(status: Optional[str] = None) -> int:
+    """Count actions, optionally filtered by status, without loading the rows."""
+    conn = db.get_connection()
+    if status:
+        cursor = conn.execute("SELECT COUNT(*) FROM pending_actions WHERE status = ?", (status,))
+    else:
+        cursor = conn.execute("SELECT COUNT(*) FROM pending_actions")
+    result = cursor.fetchone()
+    return int(result[0]) if result else 0
+
+
 def get_pending_for_domain(domain: str) -> Optional[dict[str, Any]]:
     """Get pending action for a specific domain."""
     conn = db.get_connection()
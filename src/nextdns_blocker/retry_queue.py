@@ -318,30 +318,40 @@ def process_queue(
             result.failed.append(item)
 
     # Count items that weren't ready
-    all_items = get_queue_items()
-    result.skipped = len(all_items) - len(ready_items)
+    result.skipped = db.count_retry_entries() - len(ready_items)
 
     return result
 
 
 def get_queue_stats() -> dict[str, Any]:
     """Get statistics about the retry queue."""
-    items = get_queue_items()
-    ready = [i for i in items if i.is_ready()]
+    conn = db.get_connection()
+    now = datetime.now().isoformat()
 
-    by_action: dict[str, int] = {}
-    by_error: dict[str, int] = {}
-    total_attempts = 0
+    row = conn.execute(
+        """
+        SELECT
+            COUNT(*),
+            COALESCE(SUM(next_retry_at <= ?), 0),
+            COALESCE(SUM(attempt_count), 0)
+        FROM retry_queue
+        """,
+        (now,),
+    ).fetchone()
+    total, ready, total_attempts = int(row[0]), int(row[1]), int(row[2])
 
-    for item in items:
-        by_action[item.action] = by_action.get(item.action, 0) + 1
-        by_error[item.error_type] = by_error.get(item.error_type, 0) + 1
-        total_attempts += item.attempt_count
+    by_action: dict[str, int] = {
+        r[0]: r[1] for r in conn.execute("SELECT action, COUNT(*) FROM retry_queue GROUP BY action")
+    }
+    by_error: dict[str, int] = {
+        r[0]: r[1]
+        for r in conn.execute("SELECT error_type, COUNT(*) FROM retry_queue GROUP BY error_type")
+    }
 
     return {
-        "total": len(items),
-        "ready": len(ready),
-        "pending": len(items) - len(ready),
+        "total": total,
+        "ready": ready,
+        "pending": total - ready,
         "by_action": by_action,
         "by_error": by_error,
         "total_attempts": total_attempts,
@@ -92,8 +92,8 @@ def validate_impl(output_json: bool, config_dir: Optional[Path]) -> None:
         schedules_dict = domains_data.get("schedules", {})
 
     # Get valid schedule template names for reference validation
-    valid_schedule_names: set[str] = (
-        set(schedules_dict.keys()) if isinstance(schedules_dict, dict) else set()
+    valid_schedule_names: frozenset[str] = (
+        frozenset(schedules_dict) if isinstance(schedules_dict, dict) else frozenset()
     )
 
     # Expand categories to get individual domain entries
@@ -1,6 +1,7 @@
 """Pytest fixtures for nextdns-blocker tests."""
 
 import os
+import shutil
 import sys
 import tempfile
 from pathlib import Path
@@ -92,6 +93,18 @@ def temp_dir():
         yield Path(tmpdir)
 
 
+@pytest.fixture(scope="session")
+def runner():
+    """Click CLI test runner shared across the session.
+
+    CliRunner keeps no state between invoke() calls, so one instance
+    serves every CLI test.
+    """
+    from click.testing import CliRunner
+
+    return CliRunner()
+
+
 @pytest.fixture
 def mock_env_vars():
     """Mock environment variables for configuration."""
@@ -139,6 +152,45 @@ def invalid_domains_json():
     }
 
 
+@pytest.fixture(scope="session")
+def db_schema_template(tmp_path_factory):
+    """Initialize the database schema once; tests copy the resulting file.
+
+    Copying a closed (checkpointed) database is a single file copy, while
+    init_database() re-runs every CREATE statement on each call.
+    """
+    from nextdns_blocker import database as db
+
+    template_path = tmp_path_factory.mktemp("db-template") / "template.db"
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(db, "get_db_path", lambda: template_path)
+        db.close_connection()
+        db.init_database()
+        db.close_connection()
+
+    return template_path
+
+
+@pytest.fixture
+def empty_database(tmp_path, monkeypatch):
+    """Point the database module at a per-test path with no schema yet."""
+    from nextdns_blocker import database as db
+
+    test_db_path = tmp_path / "test.db"
+    monkeypatch.setattr(db, "get_db_path", lambda: test_db_path)
+    db.close_connection()
+    yield test_db_path
+    db.close_connection()
+
+
+@pytest.fixture
+def temp_database(empty_database, db_schema_template):
+    """Point the database module at a per-test copy of the initialized schema."""
+    shutil.copyfile(db_schema_template, empty_database)
+    return empty_database
+
+
 @pytest.fixture(autouse=True)
 def reset_notification_rate_limit():
     """Reset Discord notification rate limit before each test."""
@@ -21,6 +21,7 @@ from nextdns_blocker.common import (
     get_log_dir,
     is_subdomain,
     parse_env_value,
+    parse_time_minutes,
     read_secure_file,
     safe_int,
     validate_category_id,
@@ -111,6 +112,10 @@ class TestValidateDomain:
         """Test invalid domain with spaces."""
         assert validate_domain("example .com") is False
 
+    def test_trailing_newline_rejected(self):
+        """Test that a trailing newline is not accepted by the end anchor."""
+        assert validate_domain("example.com\n") is False
+
     def test_empty_domain(self):
         """Test empty domain."""
         assert validate_domain("") is False
@@ -200,6 +205,28 @@ class TestValidateTimeFormat:
         assert validate_time_format("12:00:00") is False  # Seconds not allowed
         assert validate_time_format(None) is False
         assert validate_time_format(1200) is False  # Not a string
+        assert validate_time_format("123:00") is False  # Three-digit hour
+        assert validate_time_format("12:5") is False  # Single-digit minute
+        assert validate_time_format("١٢:٠٠") is False  # Non-ASCII digits
+
+
+class TestParseTimeMinutes:
+    """Tests for parse_time_minutes function."""
+
+    def test_valid_times(self):
+        """Test conversion to minutes since midnight."""
+        assert parse_time_minutes("00:00") == 0
+        assert parse_time_minutes("9:30") == 570
+        assert parse_time_minutes("09:30") == 570
+        assert parse_time_minutes("23:59") == 1439
+
+    def test_invalid_times(self):
+        """Test invalid times return None."""
+        assert parse_time_minutes("24:00") is None
+        assert parse_time_minutes("12:60") is None
+        assert parse_time_minutes("noon") is None
+        assert parse_time_minutes("") is None
+        assert parse_time_minutes(None) is None
 
 
 class TestValidateUrl:
@@ -250,6 +277,7 @@ class TestValidateCategoryId:
         assert validate_category_id("-social") is False  # Can't start with hyphen
         assert validate_category_id("Social") is False  # Must be lowercase
         assert validate_category_id("social_media") is False  # Underscore not allowed
+        assert validate_category_id("social\n") is False  # Trailing newline
         assert validate_category_id(None) is False
         assert validate_category_id(123) is False
 
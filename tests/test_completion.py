@@ -6,7 +6,6 @@ from unittest.mock import MagicMock, patch
 
 import click
 import pytest
-from click.testing import CliRunner
 
 from nextdns_blocker.completion import (
     complete_allowlist_domains,
@@ -16,12 +15,6 @@ from nextdns_blocker.completion import (
 )
 
 
-@pytest.fixture
-def runner():
-    """Create Click CLI test runner."""
-    return CliRunner()
-
-
 @pytest.fixture
 def mock_blocklist():
     """Mock blocklist domains for completion tests."""
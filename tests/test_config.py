@@ -5,12 +5,14 @@ from unittest.mock import patch
 
 import pytest
 
+from nextdns_blocker import database as db
 from nextdns_blocker.config import (
     DEFAULT_RETRIES,
     DEFAULT_TIMEOUT,
     DEFAULT_TIMEZONE,
     get_config_dir,
     get_data_dir,
+    load_domains,
     parse_duration,
     parse_unblock_delay_seconds,
     resolve_schedule_reference,
@@ -36,6 +38,11 @@ from nextdns_blocker.config import (
 from nextdns_blocker.exceptions import ConfigurationError
 
 
+def _has_error(errors: list[str], text: str) -> bool:
+    """Return True if any error message contains text (case-insensitive)."""
+    return text.lower() in "\n".join(errors).lower()
+
+
 class TestParseDuration:
     """Tests for parse_duration function."""
 
@@ -79,6 +86,14 @@ class TestParseDuration:
             parse_duration("30")
         with pytest.raises(ValueError):
             parse_duration("30x")
+        with pytest.raises(ValueError):
+            parse_duration("m")
+        with pytest.raises(ValueError):
+            parse_duration("-5m")
+        with pytest.raises(ValueError):
+            parse_duration("1.5h")
+        with pytest.raises(ValueError):
+            parse_duration("\u0663m")  # Arabic-Indic digit three
         with pytest.raises(ValueError):
             parse_duration("")
         with pytest.raises(ValueError):
@@ -104,6 +119,7 @@ class TestValidateApiKey:
         assert validate_api_key("") is False
         assert validate_api_key("short") is False  # Less than 8 chars
         assert validate_api_key("abc123!") is False  # Invalid character
+        assert validate_api_key("abcdéfgh123") is False  # Non-ASCII character
         assert validate_api_key(None) is False
         assert validate_api_key(12345) is False
 
@@ -122,6 +138,7 @@ class TestValidateProfileId:
         assert validate_profile_id("") is False
         assert validate_profile_id("abc") is False  # Less than 4 chars
         assert validate_profile_id("a" * 31) is False  # More than 30 chars
+        assert validate_profile_id("abc 123") is False  # Invalid character
         assert validate_profile_id(None) is False
 
 
@@ -154,6 +171,7 @@ class TestValidateTelegramBotToken:
         assert validate_telegram_bot_token("") is False
         assert validate_telegram_bot_token("invalid") is False
         assert validate_telegram_bot_token("123:short") is False
+        assert validate_telegram_bot_token("١٢٣٤٥٦:" + "a" * 35) is False  # Non-ASCII digits
         assert validate_telegram_bot_token(None) is False
 
 
@@ -210,15 +228,40 @@ class TestGetConfigDir:
         result = get_config_dir(temp_dir)
         assert result == temp_dir.resolve()
 
-    def test_cwd_with_env_file(self, temp_dir):
+    def test_relative_override_follows_cwd(self, temp_dir, monkeypatch):
+        """Test that a relative override resolves against the current directory."""
+        first_dir = temp_dir / "a"
+        second_dir = temp_dir / "b"
+        first_dir.mkdir()
+        second_dir.mkdir()
+
+        monkeypatch.chdir(first_dir)
+        assert get_config_dir(Path("x")) == (first_dir / "x").resolve()
+
+        monkeypatch.chdir(second_dir)
+        assert get_config_dir(Path("x")) == (second_dir / "x").resolve()
+
+    def test_cwd_with_env_file(self):
         """Test that CWD is used if .env exists."""
-        env_file = temp_dir / ".env"
-        env_file.write_text("TEST=value")
+        fake_cwd = Path("/fake/project")
 
-        with patch("nextdns_blocker.config.Path.cwd") as mock_cwd:
-            mock_cwd.return_value = temp_dir
+        with (
+            patch("nextdns_blocker.config.Path.cwd", return_value=fake_cwd),
+            patch("nextdns_blocker.config.Path.exists", return_value=True),
+        ):
             result = get_config_dir()
-            assert result == temp_dir
+            assert result == fake_cwd
+
+    def test_cwd_without_env_file(self):
+        """Test that the XDG config dir is used if CWD has no .env."""
+        fake_cwd = Path("/fake/project")
+
+        with (
+            patch("nextdns_blocker.config.Path.cwd", return_value=fake_cwd),
+            patch("nextdns_blocker.config.Path.exists", return_value=False),
+            patch("nextdns_blocker.config.user_config_dir", return_value="/fake/xdg"),
+        ):
+            assert get_config_dir() == Path("/fake/xdg")
 
     def test_invalid_override_outside_home(self):
         """Test that override outside allowed directories raises error."""
@@ -296,7 +339,7 @@ class TestValidateSchedule:
             ]
         }
         errors = validate_schedule(schedule, "test")
-        assert any("invalid day" in e.lower() for e in errors)
+        assert _has_error(errors, "invalid day")
 
     def test_invalid_time_format(self):
         """Test invalid time format."""
@@ -309,7 +352,7 @@ class TestValidateSchedule:
             ]
         }
         errors = validate_schedule(schedule, "test")
-        assert any("invalid time format" in e.lower() for e in errors)
+        assert _has_error(errors, "invalid time format")
 
     def test_missing_time_key(self):
         """Test missing start or end key."""
@@ -322,19 +365,19 @@ class TestValidateSchedule:
             ]
         }
         errors = validate_schedule(schedule, "test")
-        assert any("missing" in e.lower() for e in errors)
+        assert _has_error(errors, "missing")
 
     def test_non_list_hours(self):
         """Test that non-list hours value is invalid."""
         schedule = {"available_hours": "not a list"}
         errors = validate_schedule(schedule, "test")
-        assert any("must be a list" in e.lower() for e in errors)
+        assert _has_error(errors, "must be a list")
 
     def test_non_dict_block(self):
         """Test that non-dict hour block is invalid."""
         schedule = {"available_hours": ["not a dict"]}
         errors = validate_schedule(schedule, "test")
-        assert any("must be a dictionary" in e.lower() for e in errors)
+        assert _has_error(errors, "must be a dictionary")
 
     def test_non_dict_time_range(self):
         """Test that non-dict time_range is invalid."""
@@ -347,7 +390,7 @@ class TestValidateSchedule:
             ]
         }
         errors = validate_schedule(schedule, "test")
-        assert any("must be a dictionary" in e.lower() for e in errors)
+        assert _has_error(errors, "must be a dictionary")
 
 
 class TestValidateScheduleName:
@@ -358,6 +401,7 @@ class TestValidateScheduleName:
         assert validate_schedule_name("workdays") is True
         assert validate_schedule_name("work-hours") is True
         assert validate_schedule_name("schedule1") is True
+        assert validate_schedule_name("a" * 50) is True  # Max length
 
     def test_invalid_names(self):
         """Test invalid schedule names."""
@@ -366,6 +410,7 @@ class TestValidateScheduleName:
         assert validate_schedule_name("-schedule") is False  # Starts with hyphen
         assert validate_schedule_name("Schedule") is False  # Uppercase
         assert validate_schedule_name("a" * 51) is False  # Too long
+        assert validate_schedule_name("valid\n") is False  # Trailing newline
         assert validate_schedule_name(None) is False
 
 
@@ -391,12 +436,12 @@ class TestValidateSchedulesSection:
         """Test invalid schedule name in section."""
         schedules = {"Invalid-Name": {"available_hours": []}}
         errors = validate_schedules_section(schedules)
-        assert any("invalid name" in e.lower() for e in errors)
+        assert _has_error(errors, "invalid name")
 
     def test_non_dict_schedules(self):
         """Test that non-dict schedules section is invalid."""
         errors = validate_schedules_section("not a dict")
-        assert any("must be an object" in e.lower() for e in errors)
+        assert _has_error(errors, "must be an object")
 
 
 class TestValidateScheduleOrReference:
@@ -412,7 +457,7 @@ class TestValidateScheduleOrReference:
         """Test invalid schedule reference."""
         valid_names = {"workdays"}
         errors = validate_schedule_or_reference("unknown", "test", valid_names)
-        assert any("unknown schedule" in e.lower() for e in errors)
+        assert _has_error(errors, "unknown schedule")
 
     def test_inline_schedule(self):
         """Test inline schedule validation."""
@@ -435,7 +480,7 @@ class TestValidateScheduleOrReference:
     def test_invalid_type(self):
         """Test that invalid type returns error."""
         errors = validate_schedule_or_reference(123, "test", set())
-        assert any("must be a string" in e.lower() for e in errors)
+        assert _has_error(errors, "must be a string")
 
 
 class TestResolveScheduleReference:
@@ -486,19 +531,19 @@ class TestValidateDomainConfig:
         """Test missing domain field."""
         config = {"schedule": None}
         errors = validate_domain_config(config, 0)
-        assert any("missing" in e.lower() for e in errors)
+        assert _has_error(errors, "missing")
 
     def test_empty_domain(self):
         """Test empty domain field."""
         config = {"domain": ""}
         errors = validate_domain_config(config, 0)
-        assert any("empty" in e.lower() for e in errors)
+        assert _has_error(errors, "empty")
 
     def test_invalid_domain(self):
         """Test invalid domain format."""
         config = {"domain": "invalid domain"}
         errors = validate_domain_config(config, 0)
-        assert any("invalid domain" in e.lower() for e in errors)
+        assert _has_error(errors, "invalid domain")
 
     def test_invalid_unblock_delay(self):
         """Test invalid unblock_delay."""
@@ -507,7 +552,7 @@ class TestValidateDomainConfig:
             "unblock_delay": "invalid",
         }
         errors = validate_domain_config(config, 0)
-        assert any("unblock_delay" in e.lower() for e in errors)
+        assert _has_error(errors, "unblock_delay")
 
     def test_valid_unblock_delay(self):
         """Test valid unblock_delay."""
@@ -532,7 +577,7 @@ class TestValidateAllowlistConfig:
         """Test missing domain in allowlist."""
         config = {}
         errors = validate_allowlist_config(config, 0)
-        assert any("missing" in e.lower() for e in errors)
+        assert _has_error(errors, "missing")
 
     def test_invalid_suppress_warning(self):
         """Test invalid suppress_subdomain_warning type."""
@@ -541,7 +586,7 @@ class TestValidateAllowlistConfig:
             "suppress_subdomain_warning": "not a bool",
         }
         errors = validate_allowlist_config(config, 0)
-        assert any("boolean" in e.lower() for e in errors)
+        assert _has_error(errors, "boolean")
 
     def test_valid_suppress_warning(self):
         """Test valid suppress_subdomain_warning."""
@@ -560,7 +605,7 @@ class TestValidateCategoryConfig:
         """Test missing id field."""
         config = {"schedule": None}
         errors = validate_category_config(config, 0)
-        assert any("missing" in e.lower() for e in errors)
+        assert _has_error(errors, "missing")
 
 
 class TestDefaults:
@@ -588,21 +633,26 @@ class TestValidateNextdnsCategory:
 
         config = {}
         errors = validate_nextdns_category(config, 0)
-        assert any("missing" in e.lower() for e in errors)
+        assert _has_error(errors, "missing")
 
     def test_invalid_category_id(self):
         """Test invalid category ID."""
 
         config = {"id": "invalid-category"}
         errors = validate_nextdns_category(config, 0)
-        assert any("invalid category" in e.lower() for e in errors)
+        assert _has_error(errors, "invalid category")
+
+    def test_invalid_category_id_suggests_close_match(self):
+        """Test typo in category ID suggests the closest valid ID."""
+        errors = validate_nextdns_category({"id": "gambing"}, 0)
+        assert _has_error(errors, "did you mean 'gambling'")
 
     def test_empty_id(self):
         """Test empty id."""
 
         config = {"id": ""}
         errors = validate_nextdns_category(config, 0)
-        assert any("empty" in e.lower() for e in errors)
+        assert _has_error(errors, "empty")
 
 
 class TestValidateNextdnsService:
@@ -620,21 +670,26 @@ class TestValidateNextdnsService:
 
         config = {}
         errors = validate_nextdns_service(config, 0)
-        assert any("missing" in e.lower() for e in errors)
+        assert _has_error(errors, "missing")
 
     def test_invalid_service_id(self):
         """Test invalid service ID."""
 
         config = {"id": "invalid-service"}
         errors = validate_nextdns_service(config, 0)
-        assert any("invalid service" in e.lower() for e in errors)
+        assert _has_error(errors, "invalid service")
+
+    def test_invalid_service_id_suggests_close_match(self):
+        """Test typo in service ID suggests the closest valid ID."""
+        errors = validate_nextdns_service({"id": "youtub"}, 0)
+        assert _has_error(errors, "did you mean 'youtube'")
 
     def test_empty_id(self):
         """Test empty id."""
 
         config = {"id": ""}
         errors = validate_nextdns_service(config, 0)
-        assert any("empty" in e.lower() for e in errors)
+        assert _has_error(errors, "empty")
 
 
 class TestValidateNoDuplicateDomains:
@@ -652,7 +707,7 @@ class TestValidateNoDuplicateDomains:
         categories = [{"id": "cat1", "domains": ["a.com"]}]
         blocklist = [{"domain": "a.com"}]
         errors = validate_no_duplicate_domains(categories, blocklist)
-        assert any("multiple locations" in e.lower() for e in errors)
+        assert _has_error(errors, "multiple locations")
 
     def test_with_duplicates_across_categories(self):
         """Test domain in multiple categories."""
@@ -662,7 +717,13 @@ class TestValidateNoDuplicateDomains:
         ]
         blocklist = []
         errors = validate_no_duplicate_domains(categories, blocklist)
-        assert any("multiple locations" in e.lower() for e in errors)
+        assert _has_error(errors, "multiple locations")
+
+    def test_non_list_category_domains_skipped(self):
+        """Test that a category whose domains is not a list contributes nothing."""
+        categories = [{"id": "cat1", "domains": None}, {"id": "cat2", "domains": {"a.com": 1}}]
+        blocklist = [{"domain": "a.com"}]
+        assert validate_no_duplicate_domains(categories, blocklist) == []
 
 
 class TestValidateNoDuplicates:
@@ -678,7 +739,7 @@ class TestValidateNoDuplicates:
         """Test list with duplicate domains."""
         entries = [{"domain": "a.com"}, {"domain": "A.COM"}]
         errors = validate_no_duplicates(entries, "blocklist")
-        assert any("duplicate" in e.lower() for e in errors)
+        assert _has_error(errors, "duplicate")
 
     def test_empty_domain_skipped(self):
         """Test that empty domains are skipped."""
@@ -686,6 +747,25 @@ class TestValidateNoDuplicates:
         errors = validate_no_duplicates(entries, "blocklist")
         assert errors == []
 
+    def test_whitespace_only_domains_compared(self):
+        """Test that whitespace-only domains still take part in the duplicate check."""
+        entries = [{"domain": " "}, {"domain": "  "}]
+        errors = validate_no_duplicates(entries, "blocklist")
+        assert _has_error(errors, "duplicate")
+
+    def test_reports_indices(self):
+        """Test that each repeat reports its index and the first occurrence."""
+        entries = [
+            {"domain": "a.com"},
+            {"domain": "b.com"},
+            {"domain": "A.com"},
+            {"domain": "a.com"},
+        ]
+        errors = validate_no_duplicates(entries, "allowlist")
+        assert len(errors) == 2
+        assert "at index 2" in errors[0] and "First occurrence at index 0" in errors[0]
+        assert "at index 3" in errors[1] and "First occurrence at index 0" in errors[1]
+
 
 class TestValidateUniqueCategoryIds:
     """Tests for validate_unique_category_ids function."""
@@ -702,4 +782,28 @@ class TestValidateUniqueCategoryIds:
 
         categories = [{"id": "cat1"}, {"id": "CAT1"}]
         errors = validate_unique_category_ids(categories)
-        assert any("duplicate" in e.lower() for e in errors)
+        assert _has_error(errors, "duplicate")
+
+
+@pytest.mark.usefixtures("temp_database")
+class TestLoadDomainsCrossChecks:
+    """Tests for the cross-entry checks load_domains runs on stored domains."""
+
+    def test_category_domain_in_allowlist_rejected(self, caplog):
+        """Test that a category domain also on the allowlist fails validation."""
+        db.add_category("cat1", domains=["Shared.com"])
+        db.add_allowed_domain("shared.com")
+
+        with pytest.raises(ConfigurationError):
+            load_domains("unused")
+        assert "Domain 'shared.com' appears in both" in caplog.text
+
+    def test_distinct_domains_load(self):
+        """Test that categories, blocklist and allowlist without overlap load."""
+        db.add_category("cat1", domains=["a.com"])
+        db.add_blocked_domain("b.com")
+        db.add_allowed_domain("c.com")
+
+        denylist, allowlist = load_domains("unused")
+        assert {d["domain"] for d in denylist} == {"a.com", "b.com"}
+        assert [a["domain"] for a in allowlist] == ["c.com"]
@@ -1,30 +1,37 @@
 """Tests for the SQLite database module."""
 
+import json
 import sqlite3
 from datetime import datetime
-from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 
 from nextdns_blocker import database as db
 
-
+EXPECTED_TABLES = frozenset(
+    {
+        "config",
+        "blocked_domains",
+        "allowed_domains",
+        "categories",
+        "category_domains",
+        "nextdns_categories",
+        "nextdns_services",
+        "schedules",
+        "pending_actions",
+        "unlock_requests",
+        "retry_queue",
+        "audit_log",
+        "daily_stats",
+        "pin_protection",
+    }
+)
+
+
+@pytest.mark.usefixtures("temp_database")
 class TestDatabaseConnection:
     """Tests for database connection management."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield test_db_path
-            db.close_connection()
-
     def test_get_connection_returns_connection(self):
         """Should return a valid SQLite connection."""
         conn = db.get_connection()
@@ -58,22 +65,18 @@ class TestDatabaseConnection:
         db.close_connection()
         assert not hasattr(db._local, "connection") or db._local.connection is None
 
+    def test_close_connection_without_connection(self):
+        """Should be a no-op when the thread never opened a connection."""
+        db.close_connection()
+        db.close_connection()
+        assert not hasattr(db._local, "connection") or db._local.connection is None
+
 
+@pytest.mark.usefixtures("empty_database")
 class TestSchemaManagement:
     """Tests for schema initialization and versioning."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            yield test_db_path
-            db.close_connection()
-
-    def test_init_database_creates_tables(self, use_temp_database):
+    def test_init_database_creates_tables(self):
         """Should create all required tables."""
         db.init_database()
         conn = db.get_connection()
@@ -82,33 +85,16 @@ class TestSchemaManagement:
         cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
         tables = {row[0] for row in cursor}
 
-        expected_tables = {
-            "config",
-            "blocked_domains",
-            "allowed_domains",
-            "categories",
-            "category_domains",
-            "nextdns_categories",
-            "nextdns_services",
-            "schedules",
-            "pending_actions",
-            "unlock_requests",
-            "retry_queue",
-            "audit_log",
-            "daily_stats",
-            "pin_protection",
-        }
-
-        assert expected_tables.issubset(tables)
+        assert EXPECTED_TABLES.issubset(tables)
 
-    def test_init_database_is_idempotent(self, use_temp_database):
+    def test_init_database_is_idempotent(self):
         """Calling init_database multiple times should be safe."""
         db.init_database()
         db.init_database()
         db.init_database()
         # Should not raise any errors
 
-    def test_schema_migrations_table_exists(self, use_temp_database):
+    def test_schema_migrations_table_exists(self):
         """Should create schema_migrations table."""
         db.init_database()
         conn = db.get_connection()
@@ -117,7 +103,7 @@ class TestSchemaManagement:
         )
         assert cursor.fetchone() is not None
 
-    def test_schema_version_is_tracked(self, use_temp_database):
+    def test_schema_version_is_tracked(self):
         """Should track the current schema version."""
         db.init_database()
         conn = db.get_connection()
@@ -125,7 +111,7 @@ class TestSchemaManagement:
         version = cursor.fetchone()[0]
         assert version == db.SCHEMA_VERSION
 
-    def test_migration_backward_compatible_with_legacy_db(self, use_temp_database):
+    def test_migration_backward_compatible_with_legacy_db(self):
         """Legacy DBs without schema_migrations should be upgraded."""
         # Simulate a legacy DB: create tables directly without migrations
         conn = db.get_connection()
@@ -145,21 +131,10 @@ class TestSchemaManagement:
         assert version == db.SCHEMA_VERSION
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestConfigOperations:
     """Tests for config key-value storage."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_set_and_get_string_config(self):
         """Should store and retrieve string values."""
         db.set_config("api_key", "test-key-123")
@@ -221,21 +196,10 @@ class TestConfigOperations:
         assert value == "updated"
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestBlockedDomainsOperations:
     """Tests for blocked domains CRUD operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_add_blocked_domain(self):
         """Should add a domain to the blocklist."""
         row_id = db.add_blocked_domain("example.com", description="Test domain")
@@ -303,21 +267,39 @@ class TestBlockedDomainsOperations:
         assert domain["description"] == "Updated"
         assert domain["locked"] == 1
 
+    def test_add_blocked_domains_bulk(self):
+        """Should write every entry with a domain and apply config defaults."""
+        schedule = {"available_hours": []}
+        count = db.add_blocked_domains(
+            [
+                {"domain": "a.com", "locked": True, "unblock_delay": "never"},
+                {"domain": "b.com", "schedule": schedule},
+                {"description": "no domain, skipped"},
+            ]
+        )
 
-class TestAllowedDomainsOperations:
-    """Tests for allowed domains CRUD operations."""
+        assert count == 2
+        a = db.get_blocked_domain("a.com")
+        assert a["locked"] == 1
+        assert a["unblock_delay"] == "never"
+        b = db.get_blocked_domain("b.com")
+        assert b["unblock_delay"] == "4h"
+        assert json.loads(b["schedule"]) == schedule
+
+    def test_add_blocked_domains_upserts(self):
+        """Should update existing rows like add_blocked_domain does."""
+        db.add_blocked_domain("example.com", description="Original")
+        db.add_blocked_domains([{"domain": "example.com", "locked": True}])
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
+        domain = db.get_blocked_domain("example.com")
+        assert domain["description"] == "Original"
+        assert domain["locked"] == 1
+        assert len(db.get_all_blocked_domains()) == 1
 
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
+
+@pytest.mark.usefixtures("temp_database")
+class TestAllowedDomainsOperations:
+    """Tests for allowed domains CRUD operations."""
 
     def test_add_allowed_domain(self):
         """Should add a domain to the allowlist."""
@@ -359,21 +341,22 @@ class TestAllowedDomainsOperations:
         domains = db.get_all_allowed_domains()
         assert len(domains) == 2
 
+    def test_add_allowed_domains_bulk(self):
+        """Should write every entry with a domain and skip the rest."""
+        count = db.add_allowed_domains(
+            [
+                {"domain": "a.com", "suppress_subdomain_warning": True},
+                {"domain": ""},
+            ]
+        )
 
-class TestPendingActionsOperations:
-    """Tests for pending actions queue operations."""
+        assert count == 1
+        assert db.get_allowed_domain("a.com")["suppress_subdomain_warning"] == 1
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
 
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
+@pytest.mark.usefixtures("temp_database")
+class TestPendingActionsOperations:
+    """Tests for pending actions queue operations."""
 
     def test_add_and_get_pending_action(self):
         """Should add and retrieve a pending action."""
@@ -435,21 +418,10 @@ class TestPendingActionsOperations:
         assert action["cancelled_at"] is not None
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestUnlockRequestsOperations:
     """Tests for unlock requests operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_add_and_get_unlock_request(self):
         """Should add and retrieve an unlock request."""
         now = datetime.now().isoformat()
@@ -488,21 +460,10 @@ class TestUnlockRequestsOperations:
         assert executable[0]["id"] == "unlock_past"
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestRetryQueueOperations:
     """Tests for retry queue operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_add_and_get_retry_entry(self):
         """Should add and retrieve a retry entry."""
         now = datetime.now().isoformat()
@@ -539,6 +500,16 @@ class TestRetryQueueOperations:
         assert len(retryable) == 1
         assert retryable[0]["id"] == "retry_past"
 
+    def test_count_retry_entries(self):
+        """Should count all entries, ready or not."""
+        now = datetime.now().isoformat()
+        assert db.count_retry_entries() == 0
+
+        db.add_retry_entry("retry_past", "past.com", "block", "error", "msg", now, now)
+        db.add_retry_entry("retry_future", "f.com", "block", "e", "m", now, "2099-12-31T23:59:59")
+
+        assert db.count_retry_entries() == 2
+
     def test_remove_retry_entry(self):
         """Should remove a retry entry."""
         now = datetime.now().isoformat()
@@ -561,21 +532,10 @@ class TestRetryQueueOperations:
         assert len(retryable) == 0
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestAuditLogOperations:
     """Tests for audit log operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_add_audit_log(self):
         """Should add an audit log entry."""
         row_id = db.add_audit_log(
@@ -615,21 +575,10 @@ class TestAuditLogOperations:
         assert blocks == 2
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestDailyStatsOperations:
     """Tests for daily statistics operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_increment_daily_stat(self):
         """Should increment a daily statistic."""
         db.increment_daily_stat("2024-01-15", "blocks", 5)
@@ -661,21 +610,10 @@ class TestDailyStatsOperations:
         assert len(stats) == 3
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestCategoryOperations:
     """Tests for category CRUD operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_add_category_with_domains(self):
         """Should add a category with associated domains."""
         db.add_category(
@@ -728,21 +666,10 @@ class TestCategoryOperations:
         assert db.get_category("to_delete") is None
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestScheduleOperations:
     """Tests for schedule template operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_add_and_get_schedule(self):
         """Should add and retrieve a schedule."""
         schedule_data = {
@@ -774,21 +701,10 @@ class TestScheduleOperations:
         assert db.get_schedule("to_delete") is None
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestNextDNSOperations:
     """Tests for NextDNS categories and services operations."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_set_and_get_nextdns_category(self):
         """Should set and retrieve NextDNS category config."""
         db.set_nextdns_category(
@@ -834,22 +750,10 @@ class TestNextDNSOperations:
         assert len(services) == 2
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestUtilityFunctions:
     """Tests for database utility functions."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-        self.db_path = test_db_path
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_database_exists(self):
         """Should detect if database exists."""
         assert db.database_exists() is True
@@ -886,21 +790,10 @@ class TestUtilityFunctions:
         assert len(export["categories"]) == 1
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestTransaction:
     """Tests for transaction context manager."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_transaction_commits_on_success(self):
         """Should commit changes on successful transaction."""
         with db.transaction() as conn:
@@ -926,21 +819,10 @@ class TestTransaction:
         assert db.is_domain_blocked("rollback.com") is False
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestSQLInjectionSafety:
     """Tests to verify SQL injection attempts are safely handled."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_blocked_domain_sql_injection(self):
         """SQL injection in blocked domain name should be treated as literal text."""
         malicious = "'; DROP TABLE blocked_domains; --"
@@ -5,7 +5,7 @@ write_secure_file(), and file locking functions.
 """
 
 import stat
-from pathlib import Path
+import sys
 from unittest.mock import patch
 
 import pytest
@@ -22,21 +22,10 @@ from nextdns_blocker.common import (
 )
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestAuditLogErrorHandling:
     """Tests for audit_log error handling when writing to SQLite."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-            db.init_database()
-            yield
-            db.close_connection()
-
     def test_audit_log_writes_to_database(self):
         """Should write to SQLite database."""
         audit_log("TEST_ACTION", "test detail")
@@ -85,11 +74,27 @@ class TestWriteSecureFileErrorHandling:
         """Should set permissions on existing file."""
         target_file = tmp_path / "existing.txt"
         target_file.write_text("old content")
+        target_file.chmod(0o644)
+
+        with patch("nextdns_blocker.common.get_log_dir", return_value=tmp_path / "logs"):
+            write_secure_file(target_file, "new content")
+
+        assert target_file.read_text() == "new content"
+        if sys.platform != "win32":
+            assert target_file.stat().st_mode & 0o777 == SECURE_FILE_MODE
+
+    def test_write_secure_file_rewrites_read_only_file(self, tmp_path):
+        """Should tighten and rewrite an existing owner read-only file."""
+        target_file = tmp_path / "readonly.txt"
+        target_file.write_text("old content that is longer")
+        target_file.chmod(0o400)
 
         with patch("nextdns_blocker.common.get_log_dir", return_value=tmp_path / "logs"):
             write_secure_file(target_file, "new content")
 
         assert target_file.read_text() == "new content"
+        if sys.platform != "win32":
+            assert target_file.stat().st_mode & 0o777 == SECURE_FILE_MODE
 
     def test_write_secure_file_handles_oserror(self, tmp_path):
         """Should raise OSError on file write failure."""
@@ -7,7 +7,6 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 import responses
-from click.testing import CliRunner
 
 from nextdns_blocker.cli import main
 from nextdns_blocker.init import (
@@ -372,11 +371,6 @@ class TestRunNonInteractive:
 class TestInitCommand:
     """Tests for init CLI command."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        return CliRunner()
-
     def test_init_help(self, runner):
         """Should show help for init command."""
         result = runner.invoke(main, ["init", "--help"])
@@ -8,9 +8,6 @@ _run_sync_after_restore().
 import subprocess
 from unittest.mock import MagicMock, patch
 
-import pytest
-from click.testing import CliRunner
-
 from nextdns_blocker import watchdog
 from nextdns_blocker.watchdog import (
     LAUNCHD_SYNC_LABEL,
@@ -22,11 +19,6 @@ from nextdns_blocker.watchdog import (
 class TestCheckLaunchdJobsRecovery:
     """Tests for _check_launchd_jobs recovery scenarios."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        return CliRunner()
-
     def test_check_launchd_restores_sync_from_existing_plist(self, runner, tmp_path):
         """Should restore sync job from existing plist file."""
         log_dir = tmp_path / "logs"
@@ -1,15 +1,17 @@
 """Tests for pending action module with SQLite backend."""
 
 from datetime import datetime, timedelta
-from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from freezegun import freeze_time
 
 from nextdns_blocker import database as db
+from nextdns_blocker import pending
 from nextdns_blocker.pending import (
     cancel_pending_action,
     cleanup_old_actions,
+    count_pending_actions,
     create_pending_action,
     generate_action_id,
     get_pending_actions,
@@ -19,25 +21,12 @@ from nextdns_blocker.pending import (
 )
 
 
-@pytest.fixture(autouse=True)
-def use_temp_database(tmp_path: Path):
-    """Use a temporary database for each test."""
-    test_db_path = tmp_path / "test.db"
-
-    # Patch the database path
-    with patch.object(db, "get_db_path", return_value=test_db_path):
-        # Clear thread-local connection
-        if hasattr(db._local, "connection"):
-            db._local.connection = None
-
-        # Initialize fresh database
-        db.init_database()
-
+@pytest.fixture
+def no_audit_log():
+    """Silence audit logging from the pending module."""
+    with patch.object(pending, "audit_log"):
         yield
 
-        # Close connection
-        db.close_connection()
-
 
 class TestGenerateActionId:
     """Tests for generate_action_id function."""
@@ -59,19 +48,19 @@ class TestGenerateActionId:
         assert len(set(ids)) == 100
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestCreatePendingAction:
     """Tests for create_pending_action function."""
 
     def test_create_action_with_delay(self):
         """Creating action with valid delay."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            action = create_pending_action("example.com", "4h", "cli")
-            assert action is not None
-            assert action["domain"] == "example.com"
-            assert action["delay"] == "4h"
-            assert action["status"] == "pending"
-            assert action["requested_by"] == "cli"
-            assert action["id"].startswith("pnd_")
+        action = create_pending_action("example.com", "4h", "cli")
+        assert action is not None
+        assert action["domain"] == "example.com"
+        assert action["delay"] == "4h"
+        assert action["status"] == "pending"
+        assert action["requested_by"] == "cli"
+        assert action["id"].startswith("pnd_")
 
     def test_create_action_never_returns_none(self):
         """Creating action with 'never' delay returns None."""
@@ -85,60 +74,72 @@ class TestCreatePendingAction:
 
     def test_create_duplicate_returns_existing(self):
         """Creating duplicate action returns existing one."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            action1 = create_pending_action("example.com", "4h", "cli")
-            action2 = create_pending_action("example.com", "24h", "cli")
-            assert action1["id"] == action2["id"]
+        action1 = create_pending_action("example.com", "4h", "cli")
+        action2 = create_pending_action("example.com", "24h", "cli")
+        assert action1["id"] == action2["id"]
 
+    @freeze_time("2024-01-01 12:00:00")
     def test_execute_at_calculated_correctly(self):
         """Execute time is calculated correctly based on delay."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            before = datetime.now()
-            action = create_pending_action("example.com", "30m", "cli")
-            after = datetime.now()
-
-            execute_at = datetime.fromisoformat(action["execute_at"])
-            expected_min = before + timedelta(minutes=30)
-            expected_max = after + timedelta(minutes=30)
+        action = create_pending_action("example.com", "30m", "cli")
 
-            assert expected_min <= execute_at <= expected_max
+        execute_at = datetime.fromisoformat(action["execute_at"])
+        assert execute_at == datetime(2024, 1, 1, 12, 30)
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestGetPendingActions:
     """Tests for get_pending_actions function."""
 
     def test_get_all_actions(self):
         """Get all pending actions."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            create_pending_action("a.com", "4h", "cli")
-            create_pending_action("b.com", "4h", "cli")
+        create_pending_action("a.com", "4h", "cli")
+        create_pending_action("b.com", "4h", "cli")
 
-            actions = get_pending_actions()
-            assert len(actions) == 2
+        actions = get_pending_actions()
+        assert len(actions) == 2
 
     def test_filter_by_status(self):
         """Filter actions by status."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            action = create_pending_action("a.com", "4h", "cli")
-            mark_action_executed(action["id"])
+        action = create_pending_action("a.com", "4h", "cli")
+        mark_action_executed(action["id"])
+
+        create_pending_action("b.com", "4h", "cli")
 
-            create_pending_action("b.com", "4h", "cli")
+        pending = get_pending_actions(status="pending")
+        assert len(pending) == 1
+        assert pending[0]["domain"] == "b.com"
 
-            pending = get_pending_actions(status="pending")
-            assert len(pending) == 1
-            assert pending[0]["domain"] == "b.com"
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
+class TestCountPendingActions:
+    """Tests for count_pending_actions function."""
 
+    def test_count_empty(self):
+        """Empty table counts zero."""
+        assert count_pending_actions() == 0
+
+    def test_count_by_status(self):
+        """Count all actions or only those with a given status."""
+        action = create_pending_action("a.com", "4h", "cli")
+        create_pending_action("b.com", "4h", "cli")
+        db.update_pending_action_status(action["id"], "executed")
+
+        assert count_pending_actions() == 2
+        assert count_pending_actions(status="pending") == 1
+        assert count_pending_actions(status="executed") == 1
+
+
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestGetPendingForDomain:
     """Tests for get_pending_for_domain function."""
 
     def test_find_existing_domain(self):
         """Find pending action for domain."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            created = create_pending_action("example.com", "4h", "cli")
-            action = get_pending_for_domain("example.com")
-            assert action is not None
-            assert action["id"] == created["id"]
+        created = create_pending_action("example.com", "4h", "cli")
+        action = get_pending_for_domain("example.com")
+        assert action is not None
+        assert action["id"] == created["id"]
 
     def test_domain_not_found(self):
         """Return None for non-existent domain."""
@@ -146,19 +147,18 @@ class TestGetPendingForDomain:
         assert action is None
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestCancelPendingAction:
     """Tests for cancel_pending_action function."""
 
     def test_cancel_existing_action(self):
         """Cancel existing pending action."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            action = create_pending_action("example.com", "4h", "cli")
-            result = cancel_pending_action(action["id"])
-            assert result is True
+        action = create_pending_action("example.com", "4h", "cli")
+        result = cancel_pending_action(action["id"])
+        assert result is True
 
-            # Verify action was removed
-            actions = get_pending_actions()
-            assert len(actions) == 0
+        # Verify action was removed
+        assert count_pending_actions() == 0
 
     def test_cancel_non_existent_action(self):
         """Cancelling non-existent action returns False."""
@@ -166,75 +166,72 @@ class TestCancelPendingAction:
         assert result is False
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestGetReadyActions:
     """Tests for get_ready_actions function."""
 
     def test_get_ready_actions(self):
         """Get actions ready for execution."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            # Create action with 0 delay (ready immediately)
-            create_pending_action("a.com", "0", "cli")
-            # Create action with future execution
-            create_pending_action("b.com", "4h", "cli")
+        # Create action with 0 delay (ready immediately)
+        create_pending_action("a.com", "0", "cli")
+        # Create action with future execution
+        create_pending_action("b.com", "4h", "cli")
 
-            ready = get_ready_actions()
-            assert len(ready) == 1
-            assert ready[0]["domain"] == "a.com"
+        ready = get_ready_actions()
+        assert len(ready) == 1
+        assert ready[0]["domain"] == "a.com"
 
     def test_skip_non_pending_status(self):
         """Skip actions that are not in pending status."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            action = create_pending_action("a.com", "0", "cli")
-            mark_action_executed(action["id"])
+        action = create_pending_action("a.com", "0", "cli")
+        mark_action_executed(action["id"])
 
-            ready = get_ready_actions()
-            assert len(ready) == 0
+        ready = get_ready_actions()
+        assert len(ready) == 0
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestMarkActionExecuted:
     """Tests for mark_action_executed function."""
 
     def test_mark_executed_removes_action(self):
         """Marking action as executed removes it from database."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            action = create_pending_action("example.com", "4h", "cli")
-            result = mark_action_executed(action["id"])
-            assert result is True
+        action = create_pending_action("example.com", "4h", "cli")
+        result = mark_action_executed(action["id"])
+        assert result is True
 
-            actions = get_pending_actions()
-            assert len(actions) == 0
+        assert count_pending_actions() == 0
 
     def test_mark_non_existent_action(self):
         """Marking non-existent action returns False."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            result = mark_action_executed("nonexistent")
-            assert result is False
+        result = mark_action_executed("nonexistent")
+        assert result is False
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestCleanupOldActions:
     """Tests for cleanup_old_actions function."""
 
     def test_cleanup_old_actions(self):
         """Clean up actions older than max_age_days."""
-        with patch("nextdns_blocker.pending.audit_log"):
-            # Create an action
-            action = create_pending_action("old.com", "4h", "cli")
-
-            # Manually update its created_at to be old
-            conn = db.get_connection()
-            old_time = (datetime.now() - timedelta(days=10)).isoformat()
-            conn.execute(
-                "UPDATE pending_actions SET created_at = ? WHERE id = ?",
-                (old_time, action["id"]),
-            )
-            conn.commit()
-
-            # Create a recent action
-            create_pending_action("recent.com", "4h", "cli")
-
-            removed = cleanup_old_actions(max_age_days=7)
-            assert removed == 1
-
-            actions = get_pending_actions()
-            assert len(actions) == 1
-            assert actions[0]["domain"] == "recent.com"
+        # Create an action
+        action = create_pending_action("old.com", "4h", "cli")
+
+        # Manually update its created_at to be old
+        conn = db.get_connection()
+        old_time = (datetime.now() - timedelta(days=10)).isoformat()
+        conn.execute(
+            "UPDATE pending_actions SET created_at = ? WHERE id = ?",
+            (old_time, action["id"]),
+        )
+        conn.commit()
+
+        # Create a recent action
+        create_pending_action("recent.com", "4h", "cli")
+
+        removed = cleanup_old_actions(max_age_days=7)
+        assert removed == 1
+
+        actions = get_pending_actions()
+        assert len(actions) == 1
+        assert actions[0]["domain"] == "recent.com"
@@ -1,7 +1,6 @@
 """Tests for pending CLI commands with SQLite backend."""
 
 from datetime import datetime, timedelta
-from pathlib import Path
 from unittest.mock import patch
 
 import pytest
@@ -12,31 +11,23 @@ from nextdns_blocker.pending_cli import pending_cli
 
 
 @pytest.fixture
-def runner():
-    """Create CLI runner."""
-    return CliRunner()
-
-
-@pytest.fixture(autouse=True)
-def use_temp_database(tmp_path: Path):
-    """Use a temporary database for each test."""
-    test_db_path = tmp_path / "test.db"
-
-    # Patch the database path
-    with patch.object(db, "get_db_path", return_value=test_db_path):
-        # Clear thread-local connection
-        if hasattr(db._local, "connection"):
-            db._local.connection = None
-
-        # Initialize fresh database
-        db.init_database()
-
-        yield
-
-        # Close connection
-        db.close_connection()
-
-
+def pending_action():
+    """Seed one pending unblock action for example.com."""
+    now = datetime.now()
+    action_id = "pnd_20251215_120000_abc123"
+    db.add_pending_action(
+        action_id=action_id,
+        action="unblock",
+        domain="example.com",
+        created_at=now.isoformat(),
+        execute_at=(now + timedelta(hours=2)).isoformat(),
+        delay="4h",
+        requested_by="cli",
+    )
+    return action_id
+
+
+@pytest.mark.usefixtures("temp_database")
 class TestPendingList:
     """Tests for pending list command."""
 
@@ -46,46 +37,20 @@ class TestPendingList:
         assert result.exit_code == 0
         assert "No pending actions" in result.output
 
-    def test_list_with_actions(self, runner: CliRunner):
+    def test_list_with_actions(self, runner: CliRunner, pending_action):
         """List pending actions."""
-        execute_at = (datetime.now() + timedelta(hours=2)).isoformat()
-        created_at = datetime.now().isoformat()
-
-        # Create action directly in database
-        db.add_pending_action(
-            action_id="pnd_20251215_120000_abc123",
-            action="unblock",
-            domain="example.com",
-            created_at=created_at,
-            execute_at=execute_at,
-            delay="4h",
-            requested_by="cli",
-        )
-
         result = runner.invoke(pending_cli, ["list"])
         assert result.exit_code == 0
         assert "example.com" in result.output
         assert "4h" in result.output
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestPendingShow:
     """Tests for pending show command."""
 
-    def test_show_action(self, runner: CliRunner):
+    def test_show_action(self, runner: CliRunner, pending_action):
         """Show details of pending action."""
-        execute_at = (datetime.now() + timedelta(hours=2)).isoformat()
-        created_at = datetime.now().isoformat()
-
-        db.add_pending_action(
-            action_id="pnd_20251215_120000_abc123",
-            action="unblock",
-            domain="example.com",
-            created_at=created_at,
-            execute_at=execute_at,
-            delay="4h",
-            requested_by="cli",
-        )
-
         result = runner.invoke(pending_cli, ["show", "abc123"])
         assert result.exit_code == 0
         assert "example.com" in result.output
@@ -98,45 +63,20 @@ class TestPendingShow:
         assert result.exit_code == 0
         assert "No action found" in result.output
 
-    def test_show_partial_id_match(self, runner: CliRunner):
+    def test_show_partial_id_match(self, runner: CliRunner, pending_action):
         """Show action using partial ID."""
-        execute_at = (datetime.now() + timedelta(hours=2)).isoformat()
-        created_at = datetime.now().isoformat()
-
-        db.add_pending_action(
-            action_id="pnd_20251215_120000_abc123",
-            action="unblock",
-            domain="example.com",
-            created_at=created_at,
-            execute_at=execute_at,
-            delay="4h",
-            requested_by="cli",
-        )
-
         # Using last 6 characters
         result = runner.invoke(pending_cli, ["show", "abc123"])
         assert result.exit_code == 0
         assert "example.com" in result.output
 
 
+@pytest.mark.usefixtures("temp_database")
 class TestPendingCancel:
     """Tests for pending cancel command."""
 
-    def test_cancel_action_confirmed(self, runner: CliRunner):
+    def test_cancel_action_confirmed(self, runner: CliRunner, pending_action):
         """Cancel action with confirmation."""
-        execute_at = (datetime.now() + timedelta(hours=2)).isoformat()
-        created_at = datetime.now().isoformat()
-
-        db.add_pending_action(
-            action_id="pnd_20251215_120000_abc123",
-            action="unblock",
-            domain="example.com",
-            created_at=created_at,
-            execute_at=execute_at,
-            delay="4h",
-            requested_by="cli",
-        )
-
         with (
             patch("nextdns_blocker.pending.audit_log"),
             patch("nextdns_blocker.notifications.send_notification"),
@@ -152,21 +92,8 @@ class TestPendingCancel:
         assert result.exit_code == 0
         assert "No pending action found" in result.output
 
-    def test_cancel_action_declined(self, runner: CliRunner):
+    def test_cancel_action_declined(self, runner: CliRunner, pending_action):
         """Cancel action declined by user."""
-        execute_at = (datetime.now() + timedelta(hours=2)).isoformat()
-        created_at = datetime.now().isoformat()
-
-        db.add_pending_action(
-            action_id="pnd_20251215_120000_abc123",
-            action="unblock",
-            domain="example.com",
-            created_at=created_at,
-            execute_at=execute_at,
-            delay="4h",
-            requested_by="cli",
-        )
-
         result = runner.invoke(pending_cli, ["cancel", "abc123"], input="n\n")
         assert result.exit_code == 0
         assert "Cancelled." in result.output
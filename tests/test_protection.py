@@ -1,7 +1,7 @@
 """Tests for protection module."""
 
+import hashlib
 from datetime import datetime, timedelta
-from pathlib import Path
 from unittest.mock import patch
 
 import pytest
@@ -10,6 +10,20 @@ from nextdns_blocker import database as db
 from nextdns_blocker import protection
 
 
+@pytest.fixture
+def no_audit_log():
+    """Silence audit logging from the protection module."""
+    with patch.object(protection, "audit_log"):
+        yield
+
+
+@pytest.fixture
+def fast_pin_hash():
+    """Use a cheap PBKDF2 iteration count; the full count costs ~0.25s per hash."""
+    with patch.object(protection, "PIN_HASH_ITERATIONS", 1_000):
+        yield
+
+
 class TestIsLocked:
     """Tests for is_locked function."""
 
@@ -149,32 +163,13 @@ class TestValidateNoLockedWeakening:
         assert "tiktok" in errors[0]
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestUnlockRequests:
     """Tests for unlock request functions."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        # Patch the database path
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            # Clear thread-local connection
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-
-            # Initialize fresh database
-            db.init_database()
-
-            yield
-
-            # Close connection
-            db.close_connection()
-
     def test_create_unlock_request(self):
         """Should create an unlock request."""
-        with patch.object(protection, "audit_log"):
-            request = protection.create_unlock_request("category", "porn", 48, "testing")
+        request = protection.create_unlock_request("category", "porn", 48, "testing")
 
         assert request["item_type"] == "category"
         assert request["item_id"] == "porn"
@@ -184,25 +179,22 @@ class TestUnlockRequests:
 
     def test_create_unlock_request_min_delay(self):
         """Should enforce minimum delay."""
-        with patch.object(protection, "audit_log"):
-            request = protection.create_unlock_request("category", "test", 1)
+        request = protection.create_unlock_request("category", "test", 1)
 
         assert request["delay_hours"] >= protection.MIN_UNLOCK_DELAY_HOURS
 
     def test_get_pending_unlock_requests(self):
         """Should return pending requests."""
-        with patch.object(protection, "audit_log"):
-            protection.create_unlock_request("category", "test1")
-            protection.create_unlock_request("service", "test2")
+        protection.create_unlock_request("category", "test1")
+        protection.create_unlock_request("service", "test2")
 
         pending = protection.get_pending_unlock_requests()
         assert len(pending) == 2
 
     def test_cancel_unlock_request(self):
         """Should cancel a pending request."""
-        with patch.object(protection, "audit_log"):
-            request = protection.create_unlock_request("category", "test")
-            result = protection.cancel_unlock_request(request["id"])
+        request = protection.create_unlock_request("category", "test")
+        result = protection.cancel_unlock_request(request["id"])
 
         assert result is True
         pending = protection.get_pending_unlock_requests()
@@ -216,8 +208,7 @@ class TestUnlockRequests:
     def test_get_executable_unlock_requests(self):
         """Should return only executable requests."""
         # Create request with 0 delay (will be min delay)
-        with patch.object(protection, "audit_log"):
-            protection.create_unlock_request("category", "test", 48)
+        protection.create_unlock_request("category", "test", 48)
 
         # Not executable yet
         executable = protection.get_executable_unlock_requests()
@@ -248,36 +239,17 @@ class TestValidateProtectionConfig:
         assert errors == []
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestExecuteUnlockRequest:
     """Tests for execute_unlock_request function."""
 
-    @pytest.fixture(autouse=True)
-    def use_temp_database(self, tmp_path: Path):
-        """Use a temporary database for each test."""
-        test_db_path = tmp_path / "test.db"
-
-        # Patch the database path
-        with patch.object(db, "get_db_path", return_value=test_db_path):
-            # Clear thread-local connection
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
-
-            # Initialize fresh database
-            db.init_database()
-
-            yield
-
-            # Close connection
-            db.close_connection()
-
     def test_execute_unlock_request_success(self, tmp_path):
         """Should execute unlock request and remove item from database."""
         # Add a NextDNS category to the database
         db.set_nextdns_category("porn", locked=True)
 
         # Create a request that's ready to execute
-        with patch.object(protection, "audit_log"):
-            request = protection.create_unlock_request("category", "porn", 24)
+        request = protection.create_unlock_request("category", "porn", 24)
 
         # Modify execute_at to be in the past using database
         conn = db.get_connection()
@@ -289,8 +261,7 @@ class TestExecuteUnlockRequest:
         conn.commit()
 
         # Execute
-        with patch.object(protection, "audit_log"):
-            result = protection.execute_unlock_request(request["id"])
+        result = protection.execute_unlock_request(request["id"])
 
         assert result is True
 
@@ -302,9 +273,8 @@ class TestExecuteUnlockRequest:
         # Add a NextDNS category to the database
         db.set_nextdns_category("test", locked=True)
 
-        with patch.object(protection, "audit_log"):
-            request = protection.create_unlock_request("category", "test", 48)
-            result = protection.execute_unlock_request(request["id"])
+        request = protection.create_unlock_request("category", "test", 48)
+        result = protection.execute_unlock_request(request["id"])
 
         assert result is False
 
@@ -342,33 +312,36 @@ class TestCanExecuteDangerousCommand:
         assert reason == "ok"
 
 
+class TestPinHashing:
+    """Tests for PIN hashing at the production iteration count."""
+
+    def test_hash_pin_uses_configured_iterations(self):
+        """Should derive the hash with PBKDF2-SHA256 at PIN_HASH_ITERATIONS."""
+        salt = b"s" * 32
+        expected = hashlib.pbkdf2_hmac("sha256", b"1234", salt, protection.PIN_HASH_ITERATIONS)
+        assert protection._hash_pin("1234", salt) == (expected.hex(), salt)
+
+    def test_hash_iterations_default(self):
+        """Production iteration count should not drop below the OWASP recommendation."""
+        assert protection.PIN_HASH_ITERATIONS >= 600_000
+
+
+@pytest.mark.usefixtures("temp_database", "no_audit_log", "fast_pin_hash")
 class TestPinFunctions:
     """Tests for PIN-related functions."""
 
-    @pytest.fixture
-    def mock_db(self, tmp_path):
-        """Use a temporary database for PIN tests."""
-        db_path = tmp_path / "test.db"
-        with patch.object(db, "get_db_path", return_value=db_path):
-            # Close any existing connection and reinitialize
-            db.close_connection()
-            db.init_database()
-            yield tmp_path
-            db.close_connection()
-
-    def test_is_pin_enabled_false(self, mock_db):
+    def test_is_pin_enabled_false(self):
         """Should return False when no PIN set."""
         assert protection.is_pin_enabled() is False
 
-    def test_is_pin_enabled_true(self, mock_db):
+    def test_is_pin_enabled_true(self):
         """Should return True when PIN is set."""
         db.set_pin_value("hash", "somehash:salt")
         assert protection.is_pin_enabled() is True
 
-    def test_set_pin_success(self, mock_db):
+    def test_set_pin_success(self):
         """Should set PIN successfully."""
-        with patch.object(protection, "audit_log"):
-            result = protection.set_pin("1234")
+        result = protection.set_pin("1234")
         assert result is True
         assert protection.is_pin_enabled() is True
 
@@ -382,110 +355,94 @@ class TestPinFunctions:
         with pytest.raises(ValueError):
             protection.set_pin("a" * 50)
 
-    def test_verify_pin_correct(self, mock_db):
+    def test_verify_pin_correct(self):
         """Should verify correct PIN."""
-        with patch.object(protection, "audit_log"):
-            protection.set_pin("1234")
-            result = protection.verify_pin("1234")
+        protection.set_pin("1234")
+        result = protection.verify_pin("1234")
         assert result is True
 
-    def test_verify_pin_incorrect(self, mock_db):
+    def test_verify_pin_incorrect(self):
         """Should reject incorrect PIN."""
-        with patch.object(protection, "audit_log"):
-            protection.set_pin("1234")
-            result = protection.verify_pin("wrong")
+        protection.set_pin("1234")
+        result = protection.verify_pin("wrong")
         assert result is False
 
-    def test_verify_pin_no_pin_set(self, mock_db):
+    def test_verify_pin_no_pin_set(self):
         """Should return True when no PIN set."""
         result = protection.verify_pin("anything")
         assert result is True
 
-    def test_create_pin_session(self, mock_db):
+    def test_create_pin_session(self):
         """Should create a PIN session."""
         expires = protection.create_pin_session()
         assert isinstance(expires, datetime)
         assert expires > datetime.now()
 
-    def test_is_pin_session_valid_no_pin(self, mock_db):
+    def test_is_pin_session_valid_no_pin(self):
         """Should return True when no PIN enabled."""
         assert protection.is_pin_session_valid() is True
 
-    def test_is_pin_session_valid_active(self, mock_db):
+    def test_is_pin_session_valid_active(self):
         """Should return True for active session."""
-        with patch.object(protection, "audit_log"):
-            protection.set_pin("1234")
-            protection.verify_pin("1234")  # Creates session
-            assert protection.is_pin_session_valid() is True
+        protection.set_pin("1234")
+        protection.verify_pin("1234")  # Creates session
+        assert protection.is_pin_session_valid() is True
 
-    def test_is_pin_session_valid_no_session(self, mock_db):
+    def test_is_pin_session_valid_no_session(self):
         """Should return False when no session exists."""
         db.set_pin_value("hash", "somehash:salt")
         assert protection.is_pin_session_valid() is False
 
-    def test_get_pin_session_remaining_no_pin(self, mock_db):
+    def test_get_pin_session_remaining_no_pin(self):
         """Should return None when no PIN enabled."""
         assert protection.get_pin_session_remaining() is None
 
-    def test_get_pin_session_remaining_active(self, mock_db):
+    def test_get_pin_session_remaining_active(self):
         """Should return remaining time for active session."""
-        with patch.object(protection, "audit_log"):
-            protection.set_pin("1234")
-            protection.verify_pin("1234")
-            remaining = protection.get_pin_session_remaining()
-            assert remaining is not None
-            assert "m" in remaining
-
-    def test_is_pin_locked_out_false(self, mock_db):
+        protection.set_pin("1234")
+        protection.verify_pin("1234")
+        remaining = protection.get_pin_session_remaining()
+        assert remaining is not None
+        assert "m" in remaining
+
+    def test_is_pin_locked_out_false(self):
         """Should return False when no attempts."""
         assert protection.is_pin_locked_out() is False
 
-    def test_get_failed_attempts_count_zero(self, mock_db):
+    def test_get_failed_attempts_count_zero(self):
         """Should return 0 when no attempts."""
         assert protection.get_failed_attempts_count() == 0
 
-    def test_get_lockout_remaining_not_locked(self, mock_db):
+    def test_get_lockout_remaining_not_locked(self):
         """Should return None when not locked out."""
         assert protection.get_lockout_remaining() is None
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log", "fast_pin_hash")
 class TestRemovePin:
     """Tests for remove_pin function."""
 
-    @pytest.fixture
-    def mock_db(self, tmp_path):
-        """Use a temporary database for PIN tests."""
-        db_path = tmp_path / "test.db"
-        with patch.object(db, "get_db_path", return_value=db_path):
-            db.close_connection()
-            db.init_database()
-            yield tmp_path
-            db.close_connection()
-
-    def test_remove_pin_not_enabled(self, mock_db):
+    def test_remove_pin_not_enabled(self):
         """Should return False when PIN not enabled."""
         assert protection.remove_pin("1234") is False
 
-    def test_remove_pin_wrong_pin(self, mock_db):
+    def test_remove_pin_wrong_pin(self):
         """Should return False for wrong PIN."""
-        with patch.object(protection, "audit_log"):
-            protection.set_pin("1234")
-            result = protection.remove_pin("wrong")
+        protection.set_pin("1234")
+        result = protection.remove_pin("wrong")
         assert result is False
 
-    def test_remove_pin_force(self, mock_db):
+    def test_remove_pin_force(self):
         """Should remove PIN immediately with force=True."""
-        with patch.object(protection, "audit_log"):
-            protection.set_pin("1234")
-            result = protection.remove_pin("1234", force=True)
+        protection.set_pin("1234")
+        result = protection.remove_pin("1234", force=True)
         assert result is True
         assert protection.is_pin_enabled() is False
 
-    def test_remove_pin_creates_pending(self, mock_db):
+    def test_remove_pin_creates_pending(self):
         """Should create pending removal request without force."""
-        with patch.object(protection, "audit_log"):
-            protection.set_pin("1234")
-            result = protection.remove_pin("1234", force=False)
+        protection.set_pin("1234")
+        result = protection.remove_pin("1234", force=False)
         assert result is True
         # PIN should still be enabled (waiting for delay)
         assert protection.is_pin_enabled() is True
@@ -1,12 +1,11 @@
 """Tests for retry queue module with SQLite backend."""
 
 from datetime import datetime, timedelta
-from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from nextdns_blocker import database as db
+from nextdns_blocker import retry_queue
 from nextdns_blocker.client import APIRequestResult
 from nextdns_blocker.retry_queue import (
     DEFAULT_INITIAL_BACKOFF,
@@ -26,25 +25,12 @@ from nextdns_blocker.retry_queue import (
 )
 
 
-@pytest.fixture(autouse=True)
-def use_temp_database(tmp_path: Path):
-    """Use a temporary database for each test."""
-    test_db_path = tmp_path / "test.db"
-
-    # Patch the database path
-    with patch.object(db, "get_db_path", return_value=test_db_path):
-        # Clear thread-local connection
-        if hasattr(db._local, "connection"):
-            db._local.connection = None
-
-        # Initialize fresh database
-        db.init_database()
-
+@pytest.fixture
+def no_audit_log():
+    """Silence audit logging from the retry queue module."""
+    with patch.object(retry_queue, "audit_log"):
         yield
 
-        # Close connection
-        db.close_connection()
-
 
 class TestRetryItem:
     """Tests for RetryItem dataclass."""
@@ -175,81 +161,78 @@ class TestGenerateRetryId:
         assert len(set(ids)) == 100
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestEnqueue:
     """Tests for enqueue function."""
 
     def test_enqueue_item(self):
         """Should enqueue an item successfully."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            item_id = enqueue(
-                domain="example.com",
-                action="block",
-                error_type="timeout",
-                error_msg="Request timed out",
-            )
-            assert item_id is not None
-            assert item_id.startswith("ret_")
-
-            # Verify item was saved
-            items = get_queue_items()
-            assert len(items) == 1
-            assert items[0].domain == "example.com"
-            assert items[0].action == "block"
+        item_id = enqueue(
+            domain="example.com",
+            action="block",
+            error_type="timeout",
+            error_msg="Request timed out",
+        )
+        assert item_id is not None
+        assert item_id.startswith("ret_")
+
+        # Verify item was saved
+        items = get_queue_items()
+        assert len(items) == 1
+        assert items[0].domain == "example.com"
+        assert items[0].action == "block"
 
     def test_enqueue_duplicate(self):
         """Should not duplicate items for same domain+action."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            id1 = enqueue("example.com", "block", "timeout", "Error 1")
-            id2 = enqueue("example.com", "block", "timeout", "Error 2")
+        id1 = enqueue("example.com", "block", "timeout", "Error 1")
+        id2 = enqueue("example.com", "block", "timeout", "Error 2")
 
-            assert id1 == id2  # Same ID returned
-            items = get_queue_items()
-            assert len(items) == 1  # Only one item
+        assert id1 == id2  # Same ID returned
+        items = get_queue_items()
+        assert len(items) == 1  # Only one item
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestQueueOperations:
     """Tests for queue operations."""
 
     def test_get_queue_items(self):
         """Should return all queue items."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            enqueue("example1.com", "block", "timeout", "Error")
-            enqueue("example2.com", "unblock", "rate_limit", "Error")
+        enqueue("example1.com", "block", "timeout", "Error")
+        enqueue("example2.com", "unblock", "rate_limit", "Error")
 
-            items = get_queue_items()
-            assert len(items) == 2
+        items = get_queue_items()
+        assert len(items) == 2
 
     def test_get_ready_items(self):
         """Should return only ready items."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            # Add item and make it ready
-            enqueue("ready.com", "block", "timeout", "Error")
-            items = get_queue_items()
-            items[0].next_retry_at = (datetime.now() - timedelta(minutes=5)).isoformat()
-            update_item(items[0])
-
-            # Add item with future retry time
-            enqueue("not-ready.com", "block", "timeout", "Error")
-            items = get_queue_items()
-            for item in items:
-                if item.domain == "not-ready.com":
-                    item.next_retry_at = (datetime.now() + timedelta(hours=1)).isoformat()
-                    update_item(item)
-
-            ready = get_ready_items()
-            assert len(ready) == 1
-            assert ready[0].domain == "ready.com"
+        # Add item and make it ready
+        enqueue("ready.com", "block", "timeout", "Error")
+        items = get_queue_items()
+        items[0].next_retry_at = (datetime.now() - timedelta(minutes=5)).isoformat()
+        update_item(items[0])
+
+        # Add item with future retry time
+        enqueue("not-ready.com", "block", "timeout", "Error")
+        items = get_queue_items()
+        for item in items:
+            if item.domain == "not-ready.com":
+                item.next_retry_at = (datetime.now() + timedelta(hours=1)).isoformat()
+                update_item(item)
+
+        ready = get_ready_items()
+        assert len(ready) == 1
+        assert ready[0].domain == "ready.com"
 
     def test_remove_item(self):
         """Should remove item from queue."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            item_id = enqueue("example.com", "block", "timeout", "Error")
-            assert len(get_queue_items()) == 1
+        item_id = enqueue("example.com", "block", "timeout", "Error")
+        assert len(get_queue_items()) == 1
 
-            assert item_id is not None
-            result = remove_item(item_id)
-            assert result is True
-            assert len(get_queue_items()) == 0
+        assert item_id is not None
+        result = remove_item(item_id)
+        assert result is True
+        assert len(get_queue_items()) == 0
 
     def test_remove_nonexistent_item(self):
         """Should return False for non-existent item."""
@@ -258,16 +241,16 @@ class TestQueueOperations:
 
     def test_clear_queue(self):
         """Should clear all items from queue."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            enqueue("example1.com", "block", "timeout", "Error")
-            enqueue("example2.com", "unblock", "rate_limit", "Error")
-            assert len(get_queue_items()) == 2
+        enqueue("example1.com", "block", "timeout", "Error")
+        enqueue("example2.com", "unblock", "rate_limit", "Error")
+        assert len(get_queue_items()) == 2
 
-            count = clear_queue()
-            assert count == 2
-            assert len(get_queue_items()) == 0
+        count = clear_queue()
+        assert count == 2
+        assert len(get_queue_items()) == 0
 
 
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestGetQueueStats:
     """Tests for get_queue_stats function."""
 
@@ -281,18 +264,30 @@ class TestGetQueueStats:
 
     def test_queue_stats_with_items(self):
         """Should return correct stats for queue with items."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            enqueue("example1.com", "block", "timeout", "Error")
-            enqueue("example2.com", "unblock", "rate_limit", "Error")
+        enqueue("example1.com", "block", "timeout", "Error")
+        enqueue("example2.com", "unblock", "rate_limit", "Error")
 
-            stats = get_queue_stats()
-            assert stats["total"] == 2
-            assert stats["by_action"]["block"] == 1
-            assert stats["by_action"]["unblock"] == 1
-            assert stats["by_error"]["timeout"] == 1
-            assert stats["by_error"]["rate_limit"] == 1
+        stats = get_queue_stats()
+        assert stats["total"] == 2
+        assert stats["by_action"]["block"] == 1
+        assert stats["by_action"]["unblock"] == 1
+        assert stats["by_error"]["timeout"] == 1
+        assert stats["by_error"]["rate_limit"] == 1
+
+    def test_queue_stats_ready_and_attempts(self):
+        """Should split ready and pending items and sum attempts."""
+        enqueue("ready.com", "block", "timeout", "Error", initial_backoff=0)
+        enqueue("later.com", "block", "timeout", "Error", initial_backoff=3600)
 
+        stats = get_queue_stats()
+        assert stats["total"] == 2
+        assert stats["ready"] == 1
+        assert stats["pending"] == 1
+        assert stats["by_action"] == {"block": 2}
+        assert stats["total_attempts"] == 2
 
+
+@pytest.mark.usefixtures("temp_database", "no_audit_log")
 class TestProcessQueue:
     """Tests for process_queue function."""
 
@@ -307,69 +302,66 @@ class TestProcessQueue:
 
     def test_process_successful_retry(self):
         """Should process successful retry correctly."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            # Enqueue an item
-            enqueue("example.com", "block", "timeout", "Error")
+        # Enqueue an item
+        enqueue("example.com", "block", "timeout", "Error")
 
-            # Make item ready
-            items = get_queue_items()
-            items[0].next_retry_at = (datetime.now() - timedelta(minutes=1)).isoformat()
-            update_item(items[0])
+        # Make item ready
+        items = get_queue_items()
+        items[0].next_retry_at = (datetime.now() - timedelta(minutes=1)).isoformat()
+        update_item(items[0])
 
-            # Mock successful client response using *_with_result() methods
-            mock_client = MagicMock()
-            mock_client.block_with_result.return_value = (True, True, APIRequestResult.ok())
+        # Mock successful client response using *_with_result() methods
+        mock_client = MagicMock()
+        mock_client.block_with_result.return_value = (True, True, APIRequestResult.ok())
 
-            result = process_queue(mock_client)
+        result = process_queue(mock_client)
 
-            assert len(result.succeeded) == 1
-            assert result.succeeded[0].domain == "example.com"
-            assert len(get_queue_items()) == 0  # Item removed
+        assert len(result.succeeded) == 1
+        assert result.succeeded[0].domain == "example.com"
+        assert len(get_queue_items()) == 0  # Item removed
 
     def test_process_failed_retry_retryable(self):
         """Should keep retryable failures in queue."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            # Enqueue an item
-            enqueue("example.com", "block", "timeout", "Error")
-
-            # Make item ready
-            items = get_queue_items()
-            items[0].next_retry_at = (datetime.now() - timedelta(minutes=1)).isoformat()
-            update_item(items[0])
-
-            # Mock failed client response with retryable error using *_with_result() methods
-            mock_client = MagicMock()
-            mock_client.block_with_result.return_value = (
-                False,
-                False,
-                APIRequestResult.timeout("Still failing"),
-            )
-
-            result = process_queue(mock_client)
-
-            assert len(result.failed) == 1
-            assert len(get_queue_items()) == 1  # Item still in queue
-            # Attempt count should be incremented
-            items = get_queue_items()
-            assert items[0].attempt_count == 2  # Initial 1 + 1 from retry
+        # Enqueue an item
+        enqueue("example.com", "block", "timeout", "Error")
+
+        # Make item ready
+        items = get_queue_items()
+        items[0].next_retry_at = (datetime.now() - timedelta(minutes=1)).isoformat()
+        update_item(items[0])
+
+        # Mock failed client response with retryable error using *_with_result() methods
+        mock_client = MagicMock()
+        mock_client.block_with_result.return_value = (
+            False,
+            False,
+            APIRequestResult.timeout("Still failing"),
+        )
+
+        result = process_queue(mock_client)
+
+        assert len(result.failed) == 1
+        assert len(get_queue_items()) == 1  # Item still in queue
+        # Attempt count should be incremented
+        items = get_queue_items()
+        assert items[0].attempt_count == 2  # Initial 1 + 1 from retry
 
     def test_process_exhausted_retries(self):
         """Should remove items after max retries exceeded."""
-        with patch("nextdns_blocker.retry_queue.audit_log"):
-            # Enqueue an item
-            enqueue("example.com", "block", "timeout", "Error")
+        # Enqueue an item
+        enqueue("example.com", "block", "timeout", "Error")
 
-            # Make item ready with max attempts
-            items = get_queue_items()
-            items[0].next_retry_at = (datetime.now() - timedelta(minutes=1)).isoformat()
-            items[0].attempt_count = DEFAULT_MAX_RETRIES
-            update_item(items[0])
+        # Make item ready with max attempts
+        items = get_queue_items()
+        items[0].next_retry_at = (datetime.now() - timedelta(minutes=1)).isoformat()
+        items[0].attempt_count = DEFAULT_MAX_RETRIES
+        update_item(items[0])
 
-            mock_client = MagicMock()
-            result = process_queue(mock_client)
+        mock_client = MagicMock()
+        result = process_queue(mock_client)
 
-            assert len(result.exhausted) == 1
-            assert len(get_queue_items()) == 0  # Item removed
+        assert len(result.exhausted) == 1
+        assert len(get_queue_items()) == 0  # Item removed
 
 
 class TestRetryResult:
@@ -45,8 +45,7 @@ def mock_audit_log_file(temp_log_dir):
 
     with patch.object(db, "get_db_path", return_value=test_db_path):
         with patch("nextdns_blocker.common.get_log_dir", return_value=temp_log_dir):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
+            db.close_connection()
             db.init_database()
             yield test_db_path
             db.close_connection()
@@ -264,13 +263,6 @@ class TestSetCrontab:
 class TestCmdCheck:
     """Tests for cmd_check function using CliRunner."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_check_disabled(self, runner, mock_disabled_file):
         """Should skip check when disabled."""
         mock_disabled_file.write_text("permanent")
@@ -295,13 +287,6 @@ class TestCmdCheck:
 class TestCmdStatus:
     """Tests for cmd_status function using CliRunner."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_status_all_ok(self, runner, mock_disabled_file):
         """Should show OK status when all cron jobs present on Linux without systemd."""
         crontab = (
@@ -389,13 +374,6 @@ class TestReadSecureFile:
 class TestCmdInstall:
     """Tests for cmd_install function using CliRunner."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_install_success(self, runner, mock_audit_log_file):
         """Should install cron jobs successfully on Linux without systemd."""
         with patch.object(watchdog, "is_macos", return_value=False):
@@ -435,13 +413,6 @@ class TestCmdInstall:
 class TestCmdUninstall:
     """Tests for cmd_uninstall function using CliRunner."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_uninstall_success(self, runner, mock_audit_log_file):
         """Should uninstall cron jobs successfully on Linux without systemd."""
         crontab = (
@@ -483,13 +454,6 @@ class TestCmdUninstall:
 class TestCmdCheckRestoration:
     """Tests for cmd_check cron restoration using CliRunner."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_check_restores_missing_sync(self, runner, mock_disabled_file, mock_audit_log_file):
         """Should restore missing sync cron on Linux without systemd."""
         # First call returns no sync, second returns with sync added
@@ -549,8 +513,7 @@ class TestAuditLogWatchdog:
 
         test_db_path = temp_log_dir / "test.db"
         with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
+            db.close_connection()
             db.init_database()
 
             watchdog.audit_log("TEST", "detail")
@@ -565,8 +528,7 @@ class TestAuditLogWatchdog:
 
         test_db_path = temp_log_dir / "test.db"
         with patch.object(db, "get_db_path", return_value=test_db_path):
-            if hasattr(db._local, "connection"):
-                db._local.connection = None
+            db.close_connection()
             db.init_database()
 
             watchdog.audit_log("ACTION", "detail")
@@ -580,13 +542,6 @@ class TestAuditLogWatchdog:
 class TestMain:
     """Tests for main function using CliRunner."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_main_no_args(self, runner):
         """Should print usage when no args provided."""
         result = runner.invoke(watchdog.watchdog_cli, [])
@@ -811,13 +766,6 @@ class TestLaunchctlCommands:
 class TestCmdInstallMultiplatform:
     """Tests for cmd_install with platform dispatch."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_install_macos(self, runner, mock_audit_log_file, temp_log_dir):
         """Should use launchd on macOS."""
         with patch.object(watchdog, "is_macos", return_value=True):
@@ -846,13 +794,6 @@ class TestCmdInstallMultiplatform:
 class TestCmdUninstallMultiplatform:
     """Tests for cmd_uninstall with platform dispatch."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_uninstall_macos(self, runner, mock_audit_log_file, temp_log_dir):
         """Should use launchd on macOS."""
         # Create plist files
@@ -884,13 +825,6 @@ class TestCmdUninstallMultiplatform:
 class TestCmdStatusMultiplatform:
     """Tests for cmd_status with platform dispatch."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_status_macos(self, runner, mock_disabled_file):
         """Should show launchd status on macOS."""
         with patch.object(watchdog, "is_macos", return_value=True):
@@ -916,13 +850,6 @@ class TestCmdStatusMultiplatform:
 class TestCmdCheckMultiplatform:
     """Tests for cmd_check with platform dispatch."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_check_macos_all_loaded(self, runner, mock_disabled_file):
         """Should do nothing when launchd jobs are loaded."""
         with patch.object(watchdog, "is_macos", return_value=True):
@@ -1189,13 +1116,6 @@ class TestCreateWatchdogPlist:
 class TestInstallLaunchdCleanup:
     """Tests for cleanup behavior in _install_launchd_jobs."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_install_unloads_sync_when_watchdog_fails(
         self, runner, mock_audit_log_file, temp_log_dir
     ):
@@ -1227,13 +1147,6 @@ class TestInstallLaunchdCleanup:
 class TestUninstallLaunchdFeedback:
     """Tests for feedback in _uninstall_launchd_jobs."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_uninstall_shows_warning_on_sync_failure(
         self, runner, mock_audit_log_file, temp_log_dir
     ):
@@ -1418,13 +1331,6 @@ class TestSystemdPaths:
 class TestSystemdCmdStatus:
     """Tests for cmd_status with systemd."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_status_systemd_all_ok(self, runner, mock_disabled_file):
         """Should show OK status when all systemd timers are active."""
         with patch.object(watchdog, "is_macos", return_value=False):
@@ -1453,13 +1359,6 @@ class TestSystemdCmdStatus:
 class TestSystemdCmdInstall:
     """Tests for cmd_install with systemd."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_install_systemd_success(self, runner, mock_audit_log_file, temp_log_dir):
         """Should install systemd timers successfully."""
         systemd_dir = temp_log_dir / ".config" / "systemd" / "user"
@@ -1508,13 +1407,6 @@ class TestSystemdCmdInstall:
 class TestSystemdCmdUninstall:
     """Tests for cmd_uninstall with systemd."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        from click.testing import CliRunner
-
-        return CliRunner()
-
     def test_cmd_uninstall_systemd_success(self, runner, mock_audit_log_file, temp_log_dir):
         """Should uninstall systemd timers successfully."""
         systemd_dir = temp_log_dir / ".config" / "systemd" / "user"
@@ -7,7 +7,6 @@ on non-Windows platforms.
 from unittest.mock import MagicMock, patch
 
 import pytest
-from click.testing import CliRunner
 
 from nextdns_blocker import watchdog
 from nextdns_blocker.watchdog import (
@@ -135,11 +134,6 @@ class TestHasWindowsTask:
 class TestInstallWindowsTasks:
     """Tests for _install_windows_tasks function."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        return CliRunner()
-
     def test_install_windows_tasks_success(self, runner, tmp_path):
         """Should install both tasks successfully."""
         log_dir = tmp_path / "logs"
@@ -248,11 +242,6 @@ class TestInstallWindowsTasks:
 class TestUninstallWindowsTasks:
     """Tests for _uninstall_windows_tasks function."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        return CliRunner()
-
     def test_uninstall_windows_tasks_success(self, runner, tmp_path):
         """Should uninstall both tasks successfully."""
         log_dir = tmp_path / "logs"
@@ -356,11 +345,6 @@ class TestUninstallWindowsTasks:
 class TestStatusWindowsTasks:
     """Tests for _status_windows_tasks function."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        return CliRunner()
-
     def test_status_windows_both_ok(self, runner, tmp_path):
         """Should show OK status when both tasks exist."""
         log_dir = tmp_path / "logs"
@@ -412,11 +396,6 @@ class TestStatusWindowsTasks:
 class TestCheckWindowsTasks:
     """Tests for _check_windows_tasks function."""
 
-    @pytest.fixture
-    def runner(self):
-        """Create Click CLI test runner."""
-        return CliRunner()
-
     def test_check_windows_restores_sync_task(self, runner, tmp_path):
         """Should restore missing sync task."""
         log_dir = tmp_path / "logs"